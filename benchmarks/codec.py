@@ -0,0 +1,111 @@
+"""Decode and encode time of every installed JSON codec over LCU sized payloads.
+
+Recorded payloads can be passed as arguments, either plain JSON documents or websocket frames. Without arguments
+the benchmark builds documents shaped and sized like champion select sessions, inventory and loot updates.
+
+    $ python benchmarks/codec.py [payload.json ...]
+"""
+import json
+import random
+import sys
+import timeit
+
+from lcu_driver.codec import CODECS
+
+
+def champ_select_session(rng):
+    def player(cell_id):
+        return {
+            'assignedPosition': rng.choice(['top', 'jungle', 'middle', 'bottom', 'utility']),
+            'cellId': cell_id, 'championId': rng.randint(0, 900), 'championPickIntent': 0,
+            'entitledFeatureType': 'NONE', 'selectedSkinId': rng.randint(0, 900000),
+            'spell1Id': 4, 'spell2Id': 14, 'summonerId': rng.randint(10 ** 6, 10 ** 9),
+            'puuid': '%032x' % rng.getrandbits(128), 'team': 1 + cell_id // 5, 'wardSkinId': -1,
+        }
+
+    actions = [[{
+        'actorCellId': cell, 'championId': rng.randint(0, 900), 'completed': rng.random() < 0.5, 'id': cell + turn,
+        'isAllyAction': cell < 5, 'isInProgress': False, 'pickTurn': turn, 'type': rng.choice(['ban', 'pick']),
+    } for cell in range(10)] for turn in range(6)]
+
+    return {
+        'actions': actions,
+        'allowBattleBoost': False, 'allowDuplicatePicks': False, 'allowLockedEvents': False, 'allowRerolling': False,
+        'allowSkinSelection': True, 'bans': {'myTeamBans': [], 'numBans': 10, 'theirTeamBans': []},
+        'benchChampions': [], 'benchEnabled': False, 'boostableSkinCount': 1,
+        'chatDetails': {'mucJwtDto': {'channelClaim': '', 'domain': 'champ-select', 'jwt': 'x' * 1200,
+                                      'targetRegion': 'eu1'}, 'multiUserChatId': '%032x' % rng.getrandbits(128),
+                        'multiUserChatPassword': '%032x' % rng.getrandbits(128)},
+        'counter': rng.randint(0, 100), 'gameId': rng.randint(10 ** 9, 10 ** 10), 'hasSimultaneousBans': True,
+        'hasSimultaneousPicks': False, 'isCustomGame': False, 'isSpectating': False, 'localPlayerCellId': 2,
+        'lockedEventIndex': -1, 'myTeam': [player(cell) for cell in range(5)],
+        'pickOrderSwaps': [], 'recoveryCounter': 0, 'rerollsRemaining': 0, 'skipChampionSelect': False,
+        'theirTeam': [player(cell) for cell in range(5, 10)],
+        'timer': {'adjustedTimeLeftInPhase': 27000, 'internalNowInEpochMs': 1700000000000, 'isInfinite': False,
+                  'phase': 'BAN_PICK', 'totalTimeInPhase': 30000}, 'trades': [],
+    }
+
+
+def inventory_update(rng, count=3000):
+    return [{
+        'expirationDate': '', 'f2p': False, 'inventoryType': rng.choice(['CHAMPION', 'CHAMPION_SKIN', 'WARD_SKIN']),
+        'itemId': rng.randint(1, 900000), 'loyalty': False, 'loyaltySources': [], 'owned': rng.random() < 0.4,
+        'ownershipType': 'OWNED', 'purchaseDate': '20200101T000000.000Z', 'quantity': 1,
+        'rental': {'endDate': 0, 'purchaseDate': 0, 'rented': False, 'winCountRemaining': 0},
+        'uuid': '%032x' % rng.getrandbits(128), 'wins': 0,
+    } for _ in range(count)]
+
+
+def loot_update(rng, count=800):
+    return {f'CHAMPION_RENTAL_{index}': {
+        'asset': '', 'count': rng.randint(1, 5), 'disenchantLootName': 'CURRENCY_champion',
+        'disenchantValue': rng.randint(90, 1260), 'displayCategories': 'CHAMPION', 'itemDesc': 'Champion Shard',
+        'itemStatus': 'OWNED', 'localizedName': '', 'lootId': f'CHAMPION_RENTAL_{index}', 'lootName':
+        'CHAMPION_RENTAL', 'rarity': 'DEFAULT', 'redeemableStatus': 'ALREADY_OWNED', 'storeItemId': index,
+        'tags': 'mage,support', 'tilePath': f'/lol-game-data/assets/v1/champion-tiles/{index}/{index}000.jpg',
+        'type': 'CHAMPION_RENTAL', 'upgradeEssenceValue': rng.randint(90, 1260), 'value': rng.randint(450, 6300),
+    } for index in range(count)}
+
+
+def generated_payloads():
+    rng = random.Random(0)
+    return {
+        'champ-select session': champ_select_session(rng),
+        'inventory update': inventory_update(rng),
+        'loot update': loot_update(rng),
+    }
+
+
+def recorded_payloads(paths):
+    payloads = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            payloads[path] = json.load(file)
+    return payloads
+
+
+def available_codecs():
+    codecs = []
+    for codec_class in CODECS.values():
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            continue
+    return codecs
+
+
+def main():
+    payloads = recorded_payloads(sys.argv[1:]) if len(sys.argv) > 1 else generated_payloads()
+    codecs = available_codecs()
+
+    print(f'{"payload":<24} {"size (KiB)":>10} {"codec":>8} {"loads (us)":>12} {"dumps (us)":>12}')
+    for name, payload in payloads.items():
+        document = json.dumps(payload)
+        for codec in codecs:
+            loads_time = min(timeit.repeat(lambda: codec.loads(document), number=20, repeat=5)) / 20 * 1e6
+            dumps_time = min(timeit.repeat(lambda: codec.dumps(payload), number=20, repeat=5)) / 20 * 1e6
+            print(f'{name:<24} {len(document) / 1024:>10.1f} {codec.name:>8} {loads_time:>12.1f} {dumps_time:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""Local stand-in for the League Client API, used by the benchmarks and for testing without a client.
+
+Serves the REST API over HTTPS, with a self-signed certificate made with the openssl command, and the WAMP-style
+websocket on ``/``. Resources written with PUT, POST, PATCH or DELETE are stored and their events are published to
+the subscribed websockets, every other GET answers a generated document of ``payload_size`` bytes.
+
+    $ python benchmarks/emulator.py --port 2999 --lockfile lockfile [--replay events.jsonl|session.gz --rate 100]
+
+The lockfile is written in the client format so ``Connection.from_lockfile`` can connect to the emulator.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+from typing import Any, Iterable, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+
+from lcu_driver.events.managers import BLANKET_TOPIC, uri_topic
+from lcu_driver.recording import read_frames
+
+Event = Tuple[str, str, Any]
+
+
+def self_signed_context():
+    """Return a server SSL context with a certificate for 127.0.0.1 valid for one day."""
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+        subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj', '/CN=127.0.0.1',
+             '-keyout', key, '-out', cert],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+    return context
+
+
+def load_events(path):
+    """Read an event stream, either a recording made by ``lcu_driver.recording.FrameRecorder`` or one JSON document
+    per line: a websocket frame ``[8, topic, event]`` or an event ``{"uri": ..., "eventType": ..., "data": ...}``."""
+    if path.endswith('.gz'):
+        lines = [frame for _, frame in read_frames(path)]
+    else:
+        with open(path) as file:
+            lines = [line for line in file if line.strip()]
+
+    events = []
+    for line in lines:
+        document = json.loads(line)
+        if isinstance(document, list) and document[0] != 8:
+            continue
+        event = document[2] if isinstance(document, list) else document
+        events.append((event['uri'], event['eventType'], event['data']))
+    return events
+
+
+class LcuEmulator:
+    """League Client API stand-in
+
+    :param password: Password of the riot user
+    :param tls: Serve HTTPS and WSS, otherwise HTTP and WS
+    :param payload_size: Approximate size in bytes of the generated GET responses
+    :param latency: Seconds every HTTP response is delayed by
+    """
+    def __init__(self, *, password='emulator', tls=True, payload_size=256, latency=0.0):
+        self.password = password
+        self.tls = tls
+        self.payload_size = payload_size
+        self.latency = latency
+        self.port = None
+        self.resources = {}
+        self.requests = 0
+        self._sockets = {}
+        self._runner = None
+        self._authorization = 'Basic ' + base64.b64encode(f'riot:{password}'.encode()).decode()
+
+    @property
+    def protocol(self):
+        return 'https' if self.tls else 'http'
+
+    @property
+    def lockfile(self):
+        """Lockfile contents in the client format"""
+        return f'LeagueClient:{os.getpid()}:{self.port}:{self.password}:{self.protocol}'
+
+    def write_lockfile(self, path):
+        with open(path, 'w') as file:
+            file.write(self.lockfile)
+        return path
+
+    async def start(self, port=0):
+        """Start serving on the loopback, a random port is used by default.
+
+        :return: Port the emulator listens on
+        """
+        app = web.Application()
+        app.router.add_get('/', self._websocket)
+        app.router.add_route('*', '/{tail:.*}', self._http)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', port, ssl_context=self_signed_context() if self.tls else None)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        await self.disconnect()
+        await self._runner.cleanup()
+
+    async def disconnect(self):
+        """Close every websocket, as the client does when it drops its sockets while still running."""
+        for ws in list(self._sockets):
+            await ws.close()
+
+    @property
+    def subscribers(self):
+        return len(self._sockets)
+
+    async def wait_for_subscribers(self, count=1):
+        while sum(1 for topics in self._sockets.values() if topics) < count:
+            await asyncio.sleep(0.01)
+
+    def _generated(self, path):
+        document = {'uri': path, 'padding': ''}
+        document['padding'] = 'x' * max(0, self.payload_size - len(json.dumps(document)))
+        return document
+
+    async def _http(self, request):
+        if request.headers.get('Authorization') != self._authorization:
+            return web.json_response({'errorCode': 'RPC_ERROR', 'httpStatus': 401}, status=401)
+
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        path = request.path
+        if request.method == 'GET':
+            if path == '/riotclient/region-locale':
+                return web.json_response({'locale': 'en_US', 'region': 'EUW', 'webLanguage': 'en'})
+            if path in self.resources:
+                return web.json_response(self.resources[path])
+            return web.json_response(self._generated(path))
+
+        if request.method == 'DELETE':
+            self.resources.pop(path, None)
+            await self.publish(path, None, 'Delete')
+            return web.Response(status=204)
+
+        body = await request.text()
+        data = json.loads(body) if body else None
+        event_type = 'Update' if path in self.resources else 'Create'
+        self.resources[path] = data
+        await self.publish(path, data, event_type)
+        return web.json_response(data)
+
+    async def _websocket(self, request):
+        if request.headers.get('Authorization') != self._authorization:
+            return web.Response(status=401)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        topics = self._sockets[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                opcode, topic = json.loads(msg.data)[:2]
+                if opcode == 5:
+                    topics.add(topic)
+                elif opcode == 6:
+                    topics.discard(topic)
+        finally:
+            self._sockets.pop(ws, None)
+        return ws
+
+    async def publish(self, uri, data, event_type='Update'):
+        """Send an event to the websockets subscribed to it.
+
+        :return: Number of websockets the event was sent to
+        """
+        event = {'data': data, 'eventType': event_type, 'uri': uri}
+        frames = {}
+        sends = []
+        topic = uri_topic(uri)
+        for ws, topics in list(self._sockets.items()):
+            if BLANKET_TOPIC in topics:
+                subscribed = BLANKET_TOPIC
+            elif topic in topics:
+                subscribed = topic
+            else:
+                continue
+            if subscribed not in frames:
+                frames[subscribed] = json.dumps([8, subscribed, event])
+            sends.append(ws.send_str(frames[subscribed]))
+        await asyncio.gather(*sends)
+        return len(sends)
+
+    async def replay(self, events: Iterable[Event], rate: Optional[float] = None):
+        """Publish a stream of events.
+
+        :param events: Events as ``(uri, event_type, data)`` tuples
+        :param rate: Events per second, as fast as possible by default
+        :return: Number of events published
+        """
+        start = time.perf_counter()
+        count = 0
+        for uri, event_type, data in events:
+            if rate is not None:
+                delay = start + count / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await self.publish(uri, data, event_type)
+            count += 1
+        return count
+
+
+async def serve(args):
+    emulator = LcuEmulator(password=args.password, tls=not args.no_tls, payload_size=args.payload_size,
+                           latency=args.latency)
+    await emulator.start(args.port)
+    if args.lockfile:
+        emulator.write_lockfile(args.lockfile)
+    print(f'Listening on {emulator.protocol}://127.0.0.1:{emulator.port}, lockfile: {emulator.lockfile}')
+
+    try:
+        if args.replay:
+            events = load_events(args.replay)
+            await emulator.wait_for_subscribers()
+            while True:
+                await emulator.replay(events, args.rate)
+                if not args.loop:
+                    break
+        await asyncio.Event().wait()
+    finally:
+        await emulator.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--password', default='emulator')
+    parser.add_argument('--lockfile', help='Path of the lockfile to write')
+    parser.add_argument('--no-tls', action='store_true', help='Serve HTTP and WS instead of HTTPS and WSS')
+    parser.add_argument('--payload-size', type=int, default=256, help='Size in bytes of the generated responses')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds every HTTP response is delayed by')
+    parser.add_argument('--replay', help='Event stream to publish once a websocket subscribes')
+    parser.add_argument('--rate', type=float, help='Events per second of the replay')
+    parser.add_argument('--loop', action='store_true', help='Replay the event stream forever')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Websocket dispatch cost against the number of registered handlers.
+
+Compares the handler index used by ``WebsocketEventManager`` with the former
+linear scan over ``registered_uris``.
+
+    $ python benchmarks/match_event.py
+"""
+import random
+import timeit
+
+from lcu_driver.events.managers import WebsocketEventManager
+
+NAMESPACES = ['lol-chat', 'lol-loot', 'lol-lobby', 'lol-gameflow', 'lol-champ-select', 'lol-summoner',
+              'lol-inventory', 'lol-collections', 'lol-matchmaking', 'lol-perks']
+RESOURCES = ['session', 'lobby', 'members', 'conversations', 'player-loot', 'current-summoner', 'pages',
+             'search', 'ready-check', 'timer']
+HANDLER_COUNTS = [1, 10, 100, 500, 1000]
+FRAMES = 20000
+
+
+def random_uri(rng):
+    return f'/{rng.choice(NAMESPACES)}/v{rng.randint(1, 4)}/{rng.choice(RESOURCES)}/{rng.randint(0, 50)}'
+
+
+def linear_scan(registered_uris, uri, event_type):
+    matches = []
+    for event in registered_uris:
+        if event['uri'] == uri or (event['uri'].endswith('/') and uri.startswith(event['uri'])):
+            if event_type.upper() in event['event_types']:
+                matches.append(event)
+    return matches
+
+
+def build_manager(rng, count):
+    manager = WebsocketEventManager()
+    for _ in range(count):
+        uri = random_uri(rng)
+        if rng.random() < 0.2:
+            uri = uri.rsplit('/', 2)[0] + '/'
+
+        async def handler(connection, event):
+            pass
+        manager.register(uri)(handler)
+    return manager
+
+
+def main():
+    rng = random.Random(0)
+    frames = [(random_uri(rng), rng.choice(['Create', 'Update', 'Delete'])) for _ in range(FRAMES)]
+
+    print(f'{"handlers":>10} {"index (us/frame)":>18} {"linear (us/frame)":>18}')
+    for count in HANDLER_COUNTS:
+        manager = build_manager(rng, count)
+
+        def indexed():
+            for uri, event_type in frames:
+                manager.matching_handlers(uri, event_type)
+
+        def linear():
+            for uri, event_type in frames:
+                linear_scan(manager.registered_uris, uri, event_type)
+
+        indexed_time = min(timeit.repeat(indexed, number=1, repeat=3)) / FRAMES * 1e6
+        linear_time = min(timeit.repeat(linear, number=1, repeat=3)) / FRAMES * 1e6
+        print(f'{count:>10} {indexed_time:>18.2f} {linear_time:>18.2f}')
+
+
+if __name__ == '__main__':
+    main()
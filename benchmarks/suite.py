@@ -0,0 +1,225 @@
+"""Throughput and latency of the driver against the local emulator.
+
+Measures ``Connection.request`` throughput, websocket frames per second through ``run_ws``, the dispatch cost per
+frame against the number of registered handlers and the latency from an event being sent to its handler running.
+
+Results can be saved and compared with the ones of another version, run both with the same arguments:
+
+    $ python benchmarks/suite.py --output baseline.json
+    $ git checkout my-branch
+    $ python benchmarks/suite.py --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from emulator import LcuEmulator
+
+from lcu_driver import Connector
+from lcu_driver.connection import Connection
+from lcu_driver.events.responses import WebsocketEventResponse
+
+# metrics where a lower value is better, the others are rates
+LOWER_IS_BETTER = ('p50', 'p99', 'mean', 'us_per_frame')
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Bench:
+    """Emulator and a connected connection, the connector is set up by the caller before :meth:`open`"""
+
+    def __init__(self, args):
+        self.args = args
+        self.emulator = LcuEmulator(tls=not args.no_tls, payload_size=args.payload_size)
+        self.connector = Connector(loop=asyncio.get_event_loop())
+        self.connection = None
+        self._task = None
+        self._closing = asyncio.Event()
+
+    async def open(self):
+        await self.emulator.start()
+        ready = asyncio.Event()
+
+        @self.connector.ready
+        async def on_ready(_):
+            ready.set()
+            # without websocket handlers the connection closes once the ready handlers return
+            await self._closing.wait()
+
+        self.connection = Connection(self.connector, self.emulator.lockfile)
+        self._task = asyncio.ensure_future(self.connection.init())
+        await ready.wait()
+        if self.connector.should_run_ws:
+            await self.emulator.wait_for_subscribers()
+        return self.connection
+
+    async def close(self):
+        self._closing.set()
+        await self.connector.stop()
+        await self.emulator.stop()
+        await self._task
+
+
+async def request_throughput(args):
+    bench = Bench(args)
+    connection = await bench.open()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(index):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await connection.request('get', f'/lol-summoner/v1/summoners/{index}')
+            await response.read()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await bench.close()
+    return {'per_second': args.requests / elapsed, 'p50': percentile(latencies, 0.5),
+            'p99': percentile(latencies, 0.99)}
+
+
+async def websocket_throughput(args):
+    bench = Bench(args)
+    received = 0
+    done = asyncio.Event()
+
+    @bench.connector.ws.register('/lol-bench/')
+    async def handler(connection, event):
+        nonlocal received
+        received += 1
+        if received == args.frames:
+            done.set()
+
+    await bench.open()
+    data = {'padding': 'x' * args.payload_size}
+    start = time.perf_counter()
+    await bench.emulator.replay((f'/lol-bench/v1/items/{index}', 'Update', data) for index in range(args.frames))
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    await bench.close()
+    return {'per_second': args.frames / elapsed}
+
+
+async def dispatch_cost(args):
+    results = {}
+    for count in (1, 10, 100, 1000):
+        connector = Connector(loop=asyncio.get_event_loop())
+        for index in range(count):
+            async def handler(connection, event):
+                pass
+            connector.ws.register(f'/lol-bench/v1/items/{index}')(handler)
+
+        events = [WebsocketEventResponse(uri=f'/lol-bench/v1/items/{index % count}', event_type='Update', data=None)
+                  for index in range(args.frames)]
+        start = time.perf_counter()
+        for event in events:
+            await connector.ws.dispatch(None, event)
+        await connector.dispatcher.close()
+        results[f'{count}_handlers_us_per_frame'] = (time.perf_counter() - start) / args.frames * 1e6
+    return results
+
+
+async def event_latency(args):
+    bench = Bench(args)
+    latencies = []
+    done = asyncio.Event()
+
+    @bench.connector.ws.register('/lol-bench/latency')
+    async def handler(connection, event):
+        latencies.append(time.perf_counter() - event.data['sent'])
+        if len(latencies) == args.latency_events:
+            done.set()
+
+    await bench.open()
+
+    def events():
+        for _ in range(args.latency_events):
+            yield '/lol-bench/latency', 'Update', {'sent': time.perf_counter(), 'padding': 'x' * args.payload_size}
+
+    await bench.emulator.replay(events(), args.rate)
+    await done.wait()
+    await bench.close()
+    return {'p50': percentile(latencies, 0.5), 'p99': percentile(latencies, 0.99),
+            'mean': statistics.mean(latencies)}
+
+
+BENCHMARKS = {
+    'request_throughput': request_throughput,
+    'websocket_throughput': websocket_throughput,
+    'dispatch_cost': dispatch_cost,
+    'event_latency': event_latency,
+}
+
+
+def compare(results, baseline):
+    print(f'\nCompared with {baseline.get("revision")} ({baseline.get("python")}):')
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            before = baseline['results'].get(name, {}).get(metric)
+            if not before:
+                continue
+            ratio = value / before
+            better = ratio < 1 if metric.endswith(LOWER_IS_BETTER) else ratio > 1
+            print(f'{name + "." + metric:>50} {ratio:>8.2f}x {"better" if better else "worse"}')
+
+
+async def run(args):
+    results = {}
+    for name in args.only or BENCHMARKS:
+        results[name] = await BENCHMARKS[name](args)
+        for metric, value in results[name].items():
+            print(f'{name + "." + metric:>50} {value:>14.6f}')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help='Benchmarks to run')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=10000)
+    parser.add_argument('--latency-events', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=500, help='Events per second of the latency benchmark')
+    parser.add_argument('--payload-size', type=int, default=256)
+    parser.add_argument('--no-tls', action='store_true')
+    parser.add_argument('--output', help='Save the results to a JSON file')
+    parser.add_argument('--compare', help='Results file of a previous run')
+    args = parser.parse_args()
+
+    results = asyncio.get_event_loop().run_until_complete(run(args))
+    report = {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'platform': sys.platform,
+        'arguments': vars(args),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
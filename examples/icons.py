@@ -16,6 +16,10 @@ async def set_random_icon(connection):
     # if HTTP status code is 201 the icon was applied successfully
     if icon.status == 201:
         print(f'Chinese icon number {random_number} was set correctly.')
+
+        # save the icon image, it's written to the file as it's downloaded
+        await connection.download(f'/lol-game-data/assets/v1/profile-icons/{random_number}.jpg',
+                                  f'icon-{random_number}.jpg')
     else:
         print('Unknown problem, the icon was not set.')
 
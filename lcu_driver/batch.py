@@ -0,0 +1,215 @@
+import asyncio
+import time
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
+
+RequestSpec = Union[Tuple[str, str], Tuple[str, str, dict], dict]
+
+
+class BatchResult:
+    """Outcome of a single request of a batch
+
+    .. py:attribute:: index
+
+        Position of the request in the batch
+    .. py:attribute:: method
+    .. py:attribute:: endpoint
+    .. py:attribute:: response
+
+        Response with its body already read, None if the request raised
+    .. py:attribute:: exception
+    .. py:attribute:: elapsed
+
+        Request duration in seconds
+    """
+    def __init__(self, index: int, method: str, endpoint: str, response=None, exception=None, elapsed=0.0):
+        self.index = index
+        self.method = method
+        self.endpoint = endpoint
+        self.response = response
+        self.exception = exception
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None and self.response.status < 400
+
+
+class BatchStats:
+    """Timing of a batch, updated as results are produced
+
+    .. py:attribute:: completed
+    .. py:attribute:: failed
+
+        Requests that raised or got a 429 or 5xx status
+    .. py:attribute:: elapsed
+
+        Seconds since the batch started until its last result
+    .. py:attribute:: total_latency
+    .. py:attribute:: max_latency
+    .. py:attribute:: concurrency
+
+        Concurrency limit when the batch finished
+    """
+    def __init__(self, concurrency: int):
+        self.completed = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.concurrency = concurrency
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.completed if self.completed else 0.0
+
+
+class _ConcurrencyLimit:
+    """Semaphore whose limit can be adjusted while it's in use."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_use = 0
+        self._waiters = []
+
+    async def acquire(self) -> None:
+        while self._in_use >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._in_use += 1
+
+    def release(self) -> None:
+        self._in_use -= 1
+        self._wake()
+
+    def resize(self, limit: int) -> None:
+        self.limit = limit
+        self._wake()
+
+    def _wake(self) -> None:
+        for waiter in self._waiters[:max(self.limit - self._in_use, 0)]:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class RequestBatch:
+    """Run many requests with bounded concurrency, yielding a :py:obj:`BatchResult` per request in completion order
+
+    Created by :meth:`lcu_driver.connection.Connection.request_many`.
+
+    With **adaptive** enabled the concurrency limit starts at **concurrency** and is halved every time a request
+    fails or takes longer than **target_latency**, then grows by one after each fast successful request.
+
+    .. py:attribute:: stats
+
+        :py:obj:`BatchStats` of the batch
+    """
+    def __init__(self, connection, requests: Iterable[RequestSpec], *, concurrency: int = 10, adaptive: bool = False,
+                 target_latency: Optional[float] = None, min_concurrency: int = 1):
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+
+        self._connection = connection
+        self._requests = requests
+        self._max_concurrency = concurrency
+        self._min_concurrency = min(min_concurrency, concurrency)
+        self._adaptive = adaptive
+        self._target_latency = target_latency
+        self._limit = _ConcurrencyLimit(concurrency)
+        self.stats = BatchStats(concurrency)
+
+    @staticmethod
+    def _parse_request(request: RequestSpec) -> Tuple[str, str, dict]:
+        if isinstance(request, dict):
+            kwargs = dict(request)
+            return kwargs.pop('method'), kwargs.pop('endpoint'), kwargs
+        if len(request) == 2:
+            return request[0], request[1], {}
+        return request[0], request[1], dict(request[2])
+
+    def _adapt(self, result: BatchResult) -> None:
+        failed = not result.ok and (result.exception is not None or result.response.status == 429
+                                    or result.response.status >= 500)
+        if failed:
+            self.stats.failed += 1
+
+        if not self._adaptive:
+            return
+
+        slow = self._target_latency is not None and result.elapsed > self._target_latency
+        if failed or slow:
+            limit = max(self._limit.limit // 2, self._min_concurrency)
+        else:
+            limit = min(self._limit.limit + 1, self._max_concurrency)
+        self._limit.resize(limit)
+        self.stats.concurrency = limit
+
+    async def _run(self, index: int, request: RequestSpec) -> BatchResult:
+        try:
+            method, endpoint, kwargs = self._parse_request(request)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return BatchResult(index, None, None, exception=e)
+        result = BatchResult(index, method, endpoint)
+
+        await self._limit.acquire()
+        start = time.perf_counter()
+        try:
+            response = await self._connection.request(method, endpoint, **kwargs)
+            # read the body so its connection goes back to the pool right away
+            await response.read()
+            result.response = response
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result.exception = e
+        finally:
+            result.elapsed = time.perf_counter() - start
+            self._limit.release()
+        return result
+
+    async def _worker(self, requests, results: asyncio.Queue) -> None:
+        for index, request in requests:
+            await results.put(await self._run(index, request))
+
+    async def __aiter__(self) -> AsyncIterator[BatchResult]:
+        start = time.perf_counter()
+        results = asyncio.Queue()
+        requests = enumerate(self._requests)
+        workers = [asyncio.ensure_future(self._worker(requests, results)) for _ in range(self._max_concurrency)]
+        done = asyncio.ensure_future(asyncio.gather(*workers))
+
+        try:
+            while True:
+                if results.empty():
+                    getter = asyncio.ensure_future(results.get())
+                    await asyncio.wait([getter, done], return_when=asyncio.FIRST_COMPLETED)
+                    if not getter.done():
+                        getter.cancel()
+                        if results.empty():
+                            break
+                        continue
+                    result = getter.result()
+                else:
+                    result = results.get_nowait()
+
+                self.stats.completed += 1
+                self.stats.total_latency += result.elapsed
+                self.stats.max_latency = max(self.stats.max_latency, result.elapsed)
+                self._adapt(result)
+                self.stats.elapsed = time.perf_counter() - start
+                yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(done, return_exceptions=True)
+
+    async def results(self) -> List[BatchResult]:
+        """Run the whole batch and return the results sorted by request position.
+
+        :rtype: list
+        """
+        return sorted([result async for result in self], key=lambda result: result.index)
@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Set
+
+
+class CacheEntry:
+    """Cached response, its body is already read
+
+    .. py:attribute:: response
+    .. py:attribute:: path
+    .. py:attribute:: expires
+    .. py:attribute:: etag
+    .. py:attribute:: last_modified
+    """
+    def __init__(self, response, path: str, expires: float):
+        self.response = response
+        self.path = path
+        self.expires = expires
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Headers turning a request for this entry into a conditional one"""
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """LRU cache of GET responses
+
+    :param int maxsize: Maximum number of cached responses
+    :param float ttl: Seconds a response stays fresh
+    :param dict ttls: Per endpoint prefix TTLs, the longest matching prefix wins. A TTL of 0 disables the cache for
+        the prefix.
+
+    .. py:attribute:: on_new_path
+
+        Called with no arguments when a response is cached for a path no other entry has
+    """
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, ttls: Optional[Dict[str, float]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._entries = OrderedDict()
+        self._paths: Dict[str, Set[Hashable]] = {}
+        self.on_new_path: Optional[Callable[[], None]] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl_for(self, path: str) -> float:
+        for prefix, ttl in self._ttls:
+            if path.startswith(prefix):
+                return ttl
+        return self.ttl
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry, fresh or not, and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, path: str, response) -> None:
+        ttl = self.ttl_for(path)
+        if ttl <= 0:
+            return
+
+        self._remove(key)
+        self._entries[key] = CacheEntry(response, path, time.monotonic() + ttl)
+        new_path = path not in self._paths
+        self._paths.setdefault(path, set()).add(key)
+        if new_path and self.on_new_path is not None:
+            self.on_new_path()
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def refresh(self, entry: CacheEntry) -> None:
+        """Extend the lifetime of an entry the client confirmed is still valid."""
+        entry.expires = time.monotonic() + self.ttl_for(entry.path)
+
+    def invalidate(self, uri: str) -> None:
+        """Drop the responses of the URI, of the resources under it and of the resources containing it."""
+        if not self._entries:
+            return
+
+        paths = [uri]
+        parent = uri
+        while parent.count('/') > 1:
+            parent = parent.rsplit('/', 1)[0]
+            paths.append(parent)
+
+        children = uri.rstrip('/') + '/'
+        paths.extend(path for path in self._paths if path.startswith(children))
+
+        for path in paths:
+            for key in list(self._paths.get(path, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    @property
+    def paths(self) -> Set[str]:
+        """Paths with at least one cached response"""
+        return set(self._paths)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._paths.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        keys = self._paths[entry.path]
+        keys.discard(key)
+        if not keys:
+            del self._paths[entry.path]
@@ -0,0 +1,96 @@
+import json
+from typing import Any, Optional, Tuple, Type, Union
+
+
+class JsonCodec:
+    """Standard library JSON codec. Every codec shares this interface.
+
+    .. py:attribute:: name
+    .. py:attribute:: errors
+
+        Exceptions raised by :meth:`loads` when the document is invalid
+    """
+    name = 'json'
+    errors: Tuple[Type[Exception], ...] = (ValueError,)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        return json.dumps(obj)
+
+    def __reduce__(self):
+        # codecs hold references to modules, they are recreated by name in other processes
+        return get_codec, (self.name,)
+
+
+class OrjsonCodec(JsonCodec):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self.errors = (orjson.JSONDecodeError,)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj)
+
+
+class MsgspecCodec(JsonCodec):
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._decode = msgspec.json.decode
+        self._encode = msgspec.json.encode
+        self.errors = (msgspec.DecodeError,)
+
+    def loads(self, data):
+        return self._decode(data)
+
+    def dumps(self, obj):
+        return self._encode(obj)
+
+
+class UjsonCodec(JsonCodec):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+        self.errors = (ValueError,)
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False)
+
+
+CODECS = {codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, UjsonCodec, JsonCodec)}
+
+
+def get_codec(codec: Optional[Union[str, JsonCodec]] = None) -> JsonCodec:
+    """Return a codec instance.
+
+    :param codec: A codec instance, the name of one (json, orjson, msgspec or ujson) or None to pick the fastest
+        installed one, falling back to the standard library.
+    :rtype: :py:obj:`lcu_driver.codec.JsonCodec`
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+
+    if codec is not None:
+        if codec not in CODECS:
+            raise ValueError(f'Unknown codec {codec}, expected one of {", ".join(CODECS)}')
+        return CODECS[codec]()
+
+    for codec_class in CODECS.values():
+        try:
+            return codec_class()
+        except ImportError:
+            continue
+    return JsonCodec()
@@ -1,32 +1,97 @@
 import asyncio
 import logging
-from json import loads, JSONDecodeError, dumps
-from typing import Union, Optional, Tuple
+import os
+import time
+from typing import Any, AsyncIterator, Iterable, Union, Optional, Set, Tuple
 
 import aiohttp
 from aiohttp import ClientConnectorError
 from psutil import Process
 
+from .batch import RequestBatch, RequestSpec
+from .cache import ResponseCache
+from .endpoints import EndpointClient
+from .events.frames import parse_event_frame
+from .events.managers import BLANKET_TOPIC, uri_topic
+from .events.pipeline import FramePipeline
 from .exceptions import EarlyPerform
+from .metrics import endpoint_template
+from .mirror import StateMirror
+from .readiness import backoff_delays
+from .recording import FrameRecorder
+from .scheduler import RequestScheduler
+from .singleflight import SingleFlight
+from .streaming import download as download_body, iter_json_array
 from .utils import parse_cmdline_args
 
 logger = logging.getLogger('lcu-driver')
 
 
+def _arguments_key(arguments) -> str:
+    return repr(sorted(arguments.items()) if isinstance(arguments, dict) else arguments)
+
+
+_WS_CLOSED = (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED,
+              aiohttp.WSMsgType.ERROR,)
+
+
 class Connection:
     """Connection
 
     :param connector: Connector instance where connection should look for events handlers
     :type connector: :py:obj:`lcu_driver.connector.Connector`
-    :param process_or_string: :py:obj:`psutil.Process` object or lockfile string
+    :param process_or_string: :py:obj:`psutil.Process` object or lockfile string, either the client lockfile
+        contents ``LeagueClient:pid:port:password:protocol`` or ``lcu_pid:pid:port:password``
     :type process_or_string: :py:obj:`psutil.Process` or string
+
+    .. py:attribute:: ready_time
+
+        Seconds the client API took to be ready, None until it is
+    .. py:attribute:: ready_attempts
+
+        Readiness probe attempts made until the client API was ready
+    .. py:attribute:: flights
+
+        :py:obj:`lcu_driver.singleflight.SingleFlight` collapsing the concurrent identical GET requests, None unless the
+        connector enables it
+    .. py:attribute:: scheduler
+
+        :py:obj:`lcu_driver.scheduler.RequestScheduler` of the requests, None unless the connector limits them
+    .. py:attribute:: reconnects
+
+        Number of times the websocket was reconnected
+    .. py:attribute:: last_gap
+
+        Seconds the websocket was disconnected the last time it was reconnected
+    .. py:attribute:: recorder
+
+        :py:obj:`lcu_driver.recording.FrameRecorder` of the received websocket frames, None unless the connector
+        records them
+    .. py:attribute:: pipeline
+
+        :py:obj:`lcu_driver.events.pipeline.FramePipeline` buffering the received websocket frames until they're
+        handled, None until the websocket is connected
     """
     def __init__(self, connector, process_or_string: Union[Process, str]):
         self._connector = connector
         self._ws = None
+        self._subscriptions = set()
         self.locals = {}
         self.closed = False
         self.session = None
+        self.cache = None
+        self.flights = None
+        self.scheduler = None
+        self.state = StateMirror(self)
+        self.ready_time = None
+        self.ready_attempts = 0
+        self.recorder = None
+        self.pipeline = None
+        self.reconnects = 0
+        self.last_gap = None
+        self._process = None
+        self._tasks = set()
+        self._loop = None
 
         self._headers = {
             'Content-Type': 'application/json',
@@ -37,6 +102,7 @@ class Connection:
         if isinstance(process_or_string, Process):
             process_args = parse_cmdline_args(process_or_string.cmdline())
 
+            self._process = process_or_string
             self._lcu_pid = process_or_string.pid
             self._pid = int(process_args['app-pid'])
             self._port = int(process_args['app-port'])
@@ -44,36 +110,94 @@ class Connection:
             self._installation_path = process_args['install-directory']
 
         elif isinstance(process_or_string, str):
-            lockfile_parts = process_or_string.split(':')
-
-            self._lcu_pid = int(lockfile_parts[0])
-            self._pid = int(lockfile_parts[1])
+            lockfile_parts = process_or_string.strip().split(':')
+
+            if lockfile_parts[0].isdigit():
+                self._lcu_pid = int(lockfile_parts[0])
+                self._pid = int(lockfile_parts[1])
+            else:
+                # lockfile written by the client, name:pid:port:password:protocol
+                self._lcu_pid = self._pid = int(lockfile_parts[1])
+                if len(lockfile_parts) > 4 and lockfile_parts[4] == 'http':
+                    self._protocols = ('http', 'ws',)
             self._port = int(lockfile_parts[2])
             self._auth_key = lockfile_parts[3]
             self._installation_path = None
 
+        self._address = f'{self._protocols[0]}://127.0.0.1:{self._port}'
+        self._endpoints = None
+
+    @classmethod
+    def from_lockfile(cls, connector, path: str) -> 'Connection':
+        """Create a connection from the lockfile the client writes in its installation directory
+
+        :param connector: Connector instance where connection should look for events handlers
+        :param path: Lockfile path
+        :rtype: :py:obj:`lcu_driver.connection.Connection`
+        """
+        with open(path) as lockfile:
+            connection = cls(connector, lockfile.read())
+        connection._installation_path = os.path.dirname(os.path.abspath(path))
+        return connection
+
     async def init(self):
         """Initialize the connection. It's called by the connector when it finds a connection
 
         :rtype: none
         """
-        self.session = aiohttp.ClientSession(auth=aiohttp.BasicAuth('riot', self._auth_key), headers=self._headers)
+        self._loop = asyncio.get_event_loop()
+
+        # every request, the websocket and the readiness probe share this pool. The client always listens on the
+        # loopback with a self-signed certificate so name resolution is cached and the certificate is never verified
+        tcp_connector = aiohttp.TCPConnector(
+            limit=self._connector.pool_size,
+            keepalive_timeout=self._connector.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=None,
+            ssl=False,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=tcp_connector,
+            auth=aiohttp.BasicAuth('riot', self._auth_key),
+            headers=self._headers,
+        )
+
+        if self._connector.cache_size > 0:
+            self.cache = ResponseCache(self._connector.cache_size, self._connector.cache_ttl,
+                                       self._connector.cache_ttls)
+            # cached resources are invalidated by their events, a new one may need its own topic
+            self.cache.on_new_path = self._subscriptions_changed
+        if self._connector.single_flight:
+            self.flights = SingleFlight()
+        if self._connector.rate_limits or self._connector.max_concurrent_requests:
+            self.scheduler = RequestScheduler(self._connector.rate_limits,
+                                              concurrency=self._connector.max_concurrent_requests,
+                                              metrics=self._connector.metrics)
 
         setattr(self, 'request', self.request)
 
         self._connector.register_connection(self)
         tasks = [asyncio.create_task(self._connector.run_event('open', self))]
-        await self._wait_api_ready()
-
-        tasks.append(asyncio.create_task(self._connector.run_event('ready', self)))
 
         try:
+            await self._wait_api_ready()
+
+            receive_task = None
             if self._connector.should_run_ws:
-                await self.run_ws()
+                await self._connect_ws()
+                receive_task = asyncio.create_task(self._receive_ws())
+
+            await asyncio.gather(*(self.state.watch(uri) for uri in self._connector.watched_uris))
+            tasks.append(asyncio.create_task(self._connector.run_event('ready', self)))
+
+            if receive_task is not None:
+                await receive_task
         except ClientConnectorError:
             logger.info('Client closed unexpectedly')
+        except asyncio.TimeoutError:
+            logger.warning('Client API not ready after %s seconds', self._connector.readiness.timeout)
         finally:
-            await asyncio.gather(*tasks)
+            await asyncio.gather(*tasks, *self._tasks)
             await self._close()
 
     async def _close(self):
@@ -90,6 +214,14 @@ class Connection:
         """
         return self._pid
 
+    @property
+    def lcu_pid(self) -> int:
+        """League Client Ux Process Id, used by the connectors to identify the connection
+
+        :rtype: int
+        """
+        return self._lcu_pid
+
     @property
     def protocols(self) -> Tuple[str, str]:
         """Return a tuple with League Client API supported protocols
@@ -128,7 +260,7 @@ class Connection:
 
         :return: str
         """
-        return f'{self._protocols[0]}://127.0.0.1:{self._port}'
+        return self._address
 
     @property
     def ws_address(self):
@@ -138,29 +270,232 @@ class Connection:
         """
         return f'{self._protocols[1]}://127.0.0.1:{self._port}'
 
-    def _produce_url(self, endpoint: str, **kwargs):
+    @property
+    def endpoints(self) -> EndpointClient:
+        """Methods calling the endpoints of the connector registry, grouped by plugin
+
+        .. code-block:: python
+
+            summoner = await connection.endpoints.lol_summoner.current_summoner()
+
+        :rtype: :py:obj:`lcu_driver.endpoints.EndpointClient`
+        """
+        registry = self._connector.endpoints
+        if self._endpoints is None or self._endpoints.registry is not registry:
+            self._endpoints = EndpointClient(self, registry)
+        return self._endpoints
+
+    def _produce_url(self, endpoint: str, path: Optional[dict] = None) -> str:
         """Return the URL to be requested."""
         if self._pid is None:
             raise EarlyPerform('request tried to be made with uninitialized or closed API')
 
-        url = f'{self.address}{endpoint}'
-        if 'path' in kwargs:
-            url = url.format(**kwargs['path'])
-            kwargs.pop('path')
-        return url
+        if path is not None:
+            endpoint = endpoint.format(**path)
+        return self._address + endpoint
 
-    async def request(self, method: str, endpoint: str, **kwargs):
+    async def request(self, method: str, endpoint: str, *, cache: bool = True, **kwargs):
         """Run an HTTP request against the API
 
         :param method: HTTP method :type method: str :param endpoint: Request Endpoint :type endpoint: str :param
+        cache: Use the response cache, if the connector enables it, for this GET request :type cache: bool :param
         kwargs: Arguments for `aiohttp.Request
         <https://docs.aiohttp.org/en/stable/client_reference.html#aiohttp.request>`_. The **data** keyworded argument
-        will be JSON encoded automatically.
+        will be JSON encoded automatically. The **path** keyworded argument fills the ``{name}`` placeholders of the
+        endpoint. When the connector limits the requests, **priority** is the class of the request, interactive, normal
+        or bulk. **deadline** is the number of seconds after which the request is cancelled and
+        :py:obj:`asyncio.TimeoutError` raised, whether it's still waiting to be sent or waiting for the client answer.
         """
-        url = self._produce_url(endpoint, **kwargs)
+        path = kwargs.pop('path', None)
+        url = self._produce_url(endpoint, path)
+        # endpoints given with path arguments are templates already
+        return await self._request(method, url, endpoint if path is not None else None, cache, kwargs)
+
+    async def _request(self, method: str, url: str, template: Optional[str], cache: bool, kwargs: dict):
+        """Run a request to a complete URL, **template** is the endpoint metrics are recorded under."""
+        # arguments of the driver, the others are given to aiohttp
+        priority = kwargs.pop('priority', 'normal')
+        deadline = kwargs.pop('deadline', None)
         if kwargs.get('data'):
-            kwargs['data'] = dumps(kwargs['data'])
-        return await self.session.request(method, url, verify_ssl=False, **kwargs)
+            kwargs['data'] = self._connector.codec.dumps(kwargs['data'])
+
+        if deadline is None:
+            return await self._measured_request(method, url, template, cache, priority, kwargs)
+        return await asyncio.wait_for(self._measured_request(method, url, template, cache, priority, kwargs), deadline)
+
+    async def _measured_request(self, method: str, url: str, template: Optional[str], cache: bool, priority: str,
+                                kwargs: dict):
+        metrics = self._connector.metrics
+        if not metrics.enabled:
+            return await self._send(method, url, cache, priority, **kwargs)
+
+        if template is None:
+            template = endpoint_template(url[len(self._address):])
+        method = method.upper()
+        start = time.perf_counter()
+        try:
+            response = await self._send(method, url, cache, priority, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            metrics.inc('lcu_requests_total', method=method, endpoint=template, status='error')
+            raise
+
+        metrics.observe('lcu_request_seconds', time.perf_counter() - start, method=method, endpoint=template)
+        metrics.inc('lcu_requests_total', method=method, endpoint=template, status=str(response.status))
+        data = kwargs.get('data')
+        if data:
+            metrics.inc('lcu_request_bytes_total', len(data.encode() if isinstance(data, str) else data),
+                        method=method, endpoint=template)
+        if response.content_length:
+            metrics.inc('lcu_response_bytes_total', response.content_length, method=method, endpoint=template)
+        return response
+
+    async def _send(self, method: str, url: str, cache: bool, priority: str, **kwargs):
+        is_get = method.upper() == 'GET'
+        path = None
+        if self.cache is not None:
+            path = url[len(self._address):].split('?', 1)[0]
+            if not is_get:
+                self.cache.invalidate(path)
+
+        if not is_get:
+            try:
+                return await self._session_request(method, url, priority, kwargs)
+            finally:
+                # a GET answered while the write was running may have cached the previous value
+                if path is not None:
+                    self.cache.invalidate(path)
+        if not cache or 'data' in kwargs or 'json' in kwargs:
+            return await self._session_request(method, url, priority, kwargs)
+        if self.flights is None:
+            return await self._get(url, path, priority, kwargs)
+
+        key = (url, _arguments_key(kwargs.get('params')), _arguments_key(kwargs.get('headers')))
+        return await self.flights.do(key, lambda: self._get(url, path, priority, kwargs, read=True))
+
+    async def _get(self, url: str, path: Optional[str], priority: str, kwargs: dict, read: bool = False):
+        if self.cache is not None:
+            response = await self._cached_request(url, path, priority, **kwargs)
+        else:
+            response = await self._session_request('GET', url, priority, kwargs)
+
+        # a response shared by several callers needs its body read before any of them gets it
+        if read:
+            await response.read()
+        return response
+
+    async def _cached_request(self, url: str, path: str, priority: str, **kwargs):
+        """Serve a GET request from the cache, revalidating stale responses when the client sent validators."""
+        key = (url, _arguments_key(kwargs.get('params')))
+
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            self.cache.hits += 1
+            return entry.response
+
+        if entry is not None and entry.validators:
+            kwargs['headers'] = {**entry.validators, **(kwargs.get('headers') or {})}
+
+        response = await self._session_request('GET', url, priority, kwargs)
+        if response.status == 304 and entry is not None:
+            response.release()
+            self.cache.revalidations += 1
+            self.cache.refresh(entry)
+            return entry.response
+
+        self.cache.misses += 1
+        if response.status == 200:
+            await response.read()
+            self.cache.put(key, path, response)
+        return response
+
+    async def _session_request(self, method: str, url: str, priority: str, kwargs: dict):
+        """Send a request to the client once the scheduler allows it."""
+        if self.scheduler is None:
+            return await self.session.request(method, url, **kwargs)
+
+        await self.scheduler.acquire(url[len(self._address):], priority)
+        try:
+            return await self.session.request(method, url, **kwargs)
+        finally:
+            self.scheduler.release()
+
+    async def request_json(self, method: str, endpoint: str, **kwargs) -> Any:
+        """Run an HTTP request against the API and return the decoded response body
+
+        Takes the same arguments as :meth:`request`. The body is decoded with the connector codec.
+
+        :return: Decoded JSON body or None when the response has no body
+        """
+        response = await self.request(method, endpoint, **kwargs)
+        body = await response.read()
+        if not body:
+            return None
+        return self._connector.codec.loads(body)
+
+    async def stream_json(self, method: str, endpoint: str, *, chunk_size: int = 65536,
+                          **kwargs) -> AsyncIterator[Any]:
+        """Run an HTTP request against the API and decode the elements of the JSON array it answers one at a time
+
+        Memory use is bound by the size of an element instead of the whole body, use it for large collections like
+        ``/lol-game-data/assets/v1/items.json``. Takes the same arguments as :meth:`request`, the response cache is
+        bypassed.
+
+        .. code-block:: python
+
+            async for item in connection.stream_json('get', '/lol-game-data/assets/v1/items.json'):
+                print(item['name'])
+
+        :param chunk_size: Bytes read at once
+        :raises: :py:obj:`aiohttp.ClientResponseError` when the response status is 400 or above
+        """
+        response = await self.request(method, endpoint, cache=False, **kwargs)
+        try:
+            async for element in iter_json_array(response, chunk_size=chunk_size):
+                yield element
+        finally:
+            response.release()
+
+    async def download(self, endpoint: str, path: str, *, chunk_size: int = 65536, **kwargs) -> int:
+        """Save the body of a GET request to a file, e.g. an icon or a splash art, without holding it in memory
+
+        Takes the same keyword arguments as :meth:`request`, the response cache is bypassed.
+
+        :param endpoint: Request Endpoint
+        :param path: Destination file
+        :param chunk_size: Bytes read at once
+        :return: Number of bytes written
+        :raises: :py:obj:`aiohttp.ClientResponseError` when the response status is 400 or above
+        """
+        response = await self.request('get', endpoint, cache=False, **kwargs)
+        try:
+            return await download_body(response, path, chunk_size=chunk_size)
+        finally:
+            response.release()
+
+    def request_many(self, requests: Iterable[RequestSpec], *, concurrency: int = 10, adaptive: bool = False,
+                     target_latency: Optional[float] = None) -> RequestBatch:
+        """Run many requests with bounded concurrency
+
+        Each request is either a tuple ``(method, endpoint)``, a tuple ``(method, endpoint, kwargs)`` or a dict with
+        the **method** and **endpoint** keys plus the :meth:`request` keyword arguments. Iterate over the returned batch
+        to get the results in completion order, response bodies are already read.
+
+        .. code-block:: python
+
+            batch = connection.request_many(('get', f'/lol-summoner/v1/summoners/{id}') for id in ids)
+            async for result in batch:
+                if result.ok:
+                    print(await result.response.json())
+            print(batch.stats.elapsed)
+
+        :param requests: Requests to run, consumed lazily
+        :param concurrency: Maximum number of simultaneous requests
+        :param adaptive: Halve the concurrency when a request fails or is slower than **target_latency** and raise it
+            back one request at a time
+        :param target_latency: Latency in seconds above which a request is considered slow
+        :rtype: :py:obj:`lcu_driver.batch.RequestBatch`
+        """
+        return RequestBatch(self, requests, concurrency=concurrency, adaptive=adaptive, target_latency=target_latency)
 
     async def run_ws(self):
         """Start the websoocket connection. This is responsible to raise Connector close event and
@@ -168,34 +503,188 @@ class Connection:
 
         :return: None
         """
-        local_session = aiohttp.ClientSession(auth=aiohttp.BasicAuth('riot', self._auth_key),
-                                              headers={'Content-Type': 'application/json',
-                                                       'Accept': 'application/json'})
-        self._ws = await local_session.ws_connect(self.ws_address, ssl=False)
-        await self._ws.send_json([5, 'OnJsonApiEvent'])
-        _ = await self._ws.receive()
-
-        while self.closed == False:
-            msg = await self._ws.receive()
-            logger.debug('Websocket frame received')
-
-            if msg.type == aiohttp.WSMsgType.TEXT:
-                try:
-                    data = loads(msg.data)[2]
-                    self._connector.ws.match_event(self._connector, self, data)
-                except JSONDecodeError:
-                    logger.warning('Error decoding the following JSON: ', msg.data)
-
-            elif msg.type == aiohttp.WSMsgType.CLOSED:
-                break
+        await self._connect_ws()
+        await self._receive_ws()
+
+    async def _connect_ws(self) -> None:
+        if self.recorder is None and self._connector.record_frames:
+            self.recorder = FrameRecorder(self._connector.record_frames.format(lcu_pid=self._lcu_pid))
+        self._ws = await self.session.ws_connect(self.ws_address)
+        await self._sync_subscriptions()
+        self._connector.ws.add_listener(self._subscriptions_changed)
+
+    async def _receive_ws(self) -> None:
+        connector = self._connector
+        self.pipeline = FramePipeline(self._process_frame, size=connector.frame_buffer_size,
+                                      overflow=connector.frame_overflow, batch_size=connector.frame_batch_size,
+                                      metrics=connector.metrics)
+        process_task = asyncio.ensure_future(self.pipeline.run())
+        try:
+            # the reader only buffers frames, parsing and dispatching them happens in the pipeline task
+            while self.closed == False:
+                msg = await self._ws.receive()
+                logger.debug('Websocket frame received')
+
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    await self.pipeline.put(msg.data)
+                elif msg.type in _WS_CLOSED:
+                    if self.closed or not await self._reconnect_ws():
+                        break
+        finally:
+            # frames received before the client went away are still handled, unless the connection was closed
+            self.pipeline.close()
+            if self.closed:
+                process_task.cancel()
+            await asyncio.gather(process_task, return_exceptions=True)
+            connector.ws.remove_listener(self._subscriptions_changed)
+            try:
+                await self._ws.close()
+            finally:
+                connector.ws.forget(self)
+                # only closed once the pipeline task is done recording the buffered frames
+                if self.recorder is not None:
+                    self.recorder.close()
+
+    async def _process_frame(self, frame: str, received: float) -> None:
+        if self.recorder is not None:
+            self.recorder.record(frame, received)
+        await self._handle_frame(frame)
+
+    def _client_running(self) -> bool:
+        # connections made from a lockfile can't tell, they rely on the reconnection timeout
+        return self._process is None or self._process.is_running()
+
+    async def _reconnect_ws(self) -> bool:
+        """Reconnect a dropped websocket with a backoff while the client is running, resubscribing to every topic.
+
+        :return: False when the websocket couldn't be reconnected within the connector reconnection timeout
+        """
+        timeout = self._connector.reconnect_timeout
+        if not timeout:
+            return False
+
+        logger.info('Websocket disconnected, reconnecting')
+        start = time.perf_counter()
+        self._connector.ws.remove_listener(self._subscriptions_changed)
         await self._ws.close()
-        await local_session.close()
 
-    async def _wait_api_ready(self) -> None:
-        while True:
+        for delay in backoff_delays(0.05, 2.0):
+            if self.closed or not self._client_running():
+                return False
+
+            # a new socket starts without subscriptions
+            self._subscriptions.clear()
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f'{self.address}/riotclient/region-locale', verify_ssl=False) as _:
-                        break
-            except aiohttp.client_exceptions.ClientConnectorError:
-                pass
+                await self._connect_ws()
+                break
+            except (aiohttp.ClientError, OSError):
+                if time.perf_counter() - start + delay > timeout:
+                    logger.warning('Websocket not reconnected after %s seconds', timeout)
+                    return False
+                await asyncio.sleep(delay)
+
+        self.reconnects += 1
+        self.last_gap = time.perf_counter() - start
+        logger.info('Websocket reconnected after %.3f seconds', self.last_gap)
+
+        # events may have been missed, cached responses and mirrored resources can be outdated
+        if self.cache is not None:
+            self.cache.clear()
+        if self._connector.resync_on_reconnect:
+            try:
+                await self.state.resync()
+            except aiohttp.ClientError:
+                logger.warning('Unable to fetch the watched resources after reconnecting', exc_info=True)
+
+        task = asyncio.ensure_future(self._connector.run_event('reconnect', self))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _handle_frame(self, frame: str) -> None:
+        """Parse a websocket TEXT frame and hand its event to the cache, the state mirror and the handlers."""
+        codec = self._connector.codec
+        metrics = self._connector.metrics
+        start = time.perf_counter() if metrics.enabled else 0.0
+        try:
+            event = parse_event_frame(frame, codec)
+        except codec.errors:
+            logger.warning('Error decoding the following JSON: %s', frame)
+            return
+
+        if event is None:
+            return
+        if self.cache is not None:
+            self.cache.invalidate(event.uri)
+        self.state.apply(event)
+        if not metrics.enabled:
+            await self._connector.ws.dispatch(self, event)
+            return
+
+        decoded = time.perf_counter()
+        await self._connector.ws.dispatch(self, event)
+        metrics.inc('lcu_ws_frames_total', uri=endpoint_template(event.uri))
+        metrics.observe('lcu_ws_decode_seconds', decoded - start)
+        metrics.observe('lcu_ws_dispatch_seconds', time.perf_counter() - decoded)
+
+    def _subscription_topics(self) -> Set[str]:
+        """Return the websocket topics this connection should be subscribed to."""
+        topics = self._connector.ws.subscription_topics()
+        if BLANKET_TOPIC in topics:
+            return topics
+        # the connector watched resources are subscribed from the first connection, before they're fetched
+        topics |= {uri_topic(uri) for uri in self.state.watched_uris.union(self._connector.watched_uris)}
+        if self.cache is not None:
+            topics |= {uri_topic(path) for path in self.cache.paths}
+        return topics
+
+    async def _sync_subscriptions(self) -> None:
+        """Subscribe to the missing topics and unsubscribe from the ones no longer needed.
+
+        New topics are subscribed before the old ones are dropped so switching to or from the blanket topic doesn't
+        lose events.
+        """
+        if self._ws is None or self._ws.closed:
+            return
+
+        topics = self._subscription_topics()
+        for topic in topics - self._subscriptions:
+            self._subscriptions.add(topic)
+            await self._ws.send_json([5, topic])
+        for topic in self._subscriptions - topics:
+            self._subscriptions.discard(topic)
+            await self._ws.send_json([6, topic])
+
+    def _subscriptions_changed(self) -> None:
+        if self._loop is None:
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        # handlers can be registered from another thread when connections run in their own event loops
+        if running_loop is self._loop:
+            task = asyncio.ensure_future(self._resync_subscriptions())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(self._resync_subscriptions(), self._loop)
+
+    async def _resync_subscriptions(self) -> None:
+        try:
+            await self._sync_subscriptions()
+        except (aiohttp.ClientError, ConnectionError):
+            # the socket is closing, a reconnection subscribes to every topic again
+            logger.warning('Unable to update the websocket subscriptions', exc_info=True)
+
+    async def _wait_api_ready(self) -> None:
+        start = time.perf_counter()
+        self.ready_attempts = await self._connector.readiness.wait(self)
+        self.ready_time = time.perf_counter() - start
+
+        metrics = self._connector.metrics
+        if metrics.enabled:
+            metrics.observe('lcu_ready_seconds', self.ready_time)
+            metrics.inc('lcu_ready_attempts_total', self.ready_attempts)
@@ -1,20 +1,113 @@
 import asyncio
 import logging
-import time
+import threading
 from abc import ABC, abstractmethod
+from typing import Dict, List
 
+from psutil import Error
+
+from .codec import get_codec
 from .connection import Connection
+from .discovery import ClientDiscovery
+from .endpoints import BUILTIN_ENDPOINTS, EndpointRegistry
+from .metrics import NULL_METRICS
+from .readiness import ReadinessProbe
+from .events.dispatcher import OVERFLOW_POLICIES, Dispatcher
 from .events.managers import ConnectorEventManager, WebsocketEventManager
-from .utils import _return_ux_process
+from .events.offload import shutdown_executors
 
 logger = logging.getLogger('lcu-driver')
 
 
 class BaseConnector(ConnectorEventManager, ABC):
-    def __init__(self, loop=None):
+    """Base connector, the keyword arguments are accepted by every connector
+
+    :param loop: Event loop used to run the connections
+    :param codec: JSON codec, or its name, used to encode request bodies and decode websocket events. Defaults to the
+        fastest one installed (orjson, msgspec or ujson) with the standard library as fallback.
+    :type codec: str or :py:obj:`lcu_driver.codec.JsonCodec`
+    :param int pool_size: Maximum number of simultaneous HTTP connections to the client, 0 for no limit
+    :param float keepalive_timeout: Seconds an idle HTTP connection is kept open to be reused
+    :param int cache_size: Number of GET responses each connection caches, 0 disables the cache. Cached responses
+        are dropped when a websocket event for the same resource is received or when the resource is modified through
+        the connection. The websocket subscribes to the cached resources, but a :py:obj:`Connector` without websocket
+        handlers or watched resources doesn't open it, its cached responses then only expire with their TTL or when
+        modified through the connection.
+    :param float cache_ttl: Seconds a cached response is served without asking the client
+    :param dict cache_ttls: TTL per endpoint prefix, e.g. ``{'/lol-game-data/assets/': 3600}``
+    :param int dispatch_workers: Number of tasks running the websocket handlers. By default every handler call runs in
+        its own task.
+    :param int dispatch_queue_size: Maximum number of handler calls waiting for a worker
+    :param str dispatch_overflow: What to do when the queue is full, **block** the websocket reader, **drop_oldest**
+        or **drop_newest** call
+    :param int handler_concurrency: Maximum number of simultaneous calls of each handler
+    :param on_handler_error: Called with the exception, the handler and its arguments when a websocket handler raises
+    :param float discovery_interval: Seconds between checks for new clients
+    :param lockfiles: Paths of the lockfiles to watch for clients starting, besides the default installation paths
+    :param readiness: Strategy used to wait for the client API to be ready before firing the ready event
+    :type readiness: :py:obj:`lcu_driver.readiness.ReadinessProbe`
+    :param metrics: Registry recording the request latencies, websocket frames, handler durations and the time the
+        client API took to be ready. Metrics are disabled by default.
+    :type metrics: :py:obj:`lcu_driver.metrics.Metrics`
+    :param str record_frames: Path of the file every received websocket frame is recorded to, see
+        :py:obj:`lcu_driver.recording.FrameRecorder`. ``{lcu_pid}`` is replaced by the client pid so each connection
+        can get its own file.
+    :param float reconnect_timeout: Seconds spent reconnecting a dropped websocket while the client is still running
+        before closing the connection, 0 to close it right away
+    :param bool resync_on_reconnect: Fetch the watched resources again once the websocket is reconnected. The response
+        cache is cleared either way.
+    :param endpoints: Endpoints exposed as :py:attr:`lcu_driver.connection.Connection.endpoints`, by default the
+        most used ones
+    :type endpoints: :py:obj:`lcu_driver.endpoints.EndpointRegistry`
+    :param bool single_flight: Send a GET request only once when the same resource, with the same parameters and
+        headers, is requested again before it answers. Every caller gets the same response with its body already read.
+    :param dict rate_limits: Requests per second, or a tuple with the requests per second and the burst size, per
+        endpoint prefix, e.g. ``{'/lol-game-data/': (20, 5)}``
+    :param int max_concurrent_requests: Maximum number of requests waiting for the client answer. Requests beyond the
+        limits wait by priority, see :meth:`lcu_driver.connection.Connection.request`.
+    :param int frame_buffer_size: Maximum number of received websocket frames waiting to be parsed and dispatched
+    :param str frame_overflow: What to do when the frame buffer is full, **block** the websocket reader,
+        **drop_oldest** or **drop_newest** frame
+    :param int frame_batch_size: Maximum number of frames handled per pass over the buffer, by default every pending
+        frame. See :py:obj:`lcu_driver.events.pipeline.FramePipeline`.
+    """
+    def __init__(self, loop=None, *, codec=None, pool_size=100, keepalive_timeout=15.0, cache_size=0, cache_ttl=60.0,
+                 cache_ttls=None, dispatch_workers=None, dispatch_queue_size=1000, dispatch_overflow='block',
+                 handler_concurrency=None, on_handler_error=None, discovery_interval=0.5, lockfiles=(),
+                 readiness=None, metrics=None, record_frames=None, reconnect_timeout=30.0, resync_on_reconnect=True,
+                 endpoints=None, single_flight=False, rate_limits=None, max_concurrent_requests=None,
+                 frame_buffer_size=1000, frame_overflow='block', frame_batch_size=None):
         super().__init__()
         self.loop = loop or asyncio.get_event_loop()
-        self.ws = WebsocketEventManager()
+        self.discovery = ClientDiscovery(interval=discovery_interval, lockfiles=lockfiles)
+        self.readiness = readiness or ReadinessProbe()
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.dispatcher = Dispatcher(dispatch_workers, dispatch_queue_size, dispatch_overflow, handler_concurrency,
+                                     on_handler_error, self.metrics)
+        self.ws = WebsocketEventManager(self.dispatcher)
+        self.codec = get_codec(codec)
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache_ttls = cache_ttls
+        self.record_frames = record_frames
+        self.reconnect_timeout = reconnect_timeout
+        self.resync_on_reconnect = resync_on_reconnect
+        self.single_flight = single_flight
+        self.rate_limits = rate_limits
+        self.max_concurrent_requests = max_concurrent_requests
+        if frame_overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Overflow policy {frame_overflow} not recognized.')
+        if frame_buffer_size < 1:
+            raise ValueError('The frame buffer must hold at least one frame')
+        if frame_batch_size is not None and frame_batch_size < 1:
+            raise ValueError('Batches must hold at least one frame')
+        self.frame_buffer_size = frame_buffer_size
+        self.frame_overflow = frame_overflow
+        self.frame_batch_size = frame_batch_size
+        self.endpoints = endpoints if endpoints is not None else EndpointRegistry(BUILTIN_ENDPOINTS)
+        self.watched_uris = []
 
     @abstractmethod
     def register_connection(self, connection: Connection):
@@ -26,14 +119,26 @@ class BaseConnector(ConnectorEventManager, ABC):
         """Cancel the connection"""
         pass
 
+    def watch(self, uri: str) -> None:
+        """Mirror a resource in the :py:attr:`lcu_driver.connection.Connection.state` of every connection.
+
+        The resource is fetched before the ready event is fired and kept current by its websocket events.
+
+        :param uri: Resource endpoint
+        """
+        if not uri.startswith('/'):
+            raise RuntimeError('every endpoint should start with a forward slash')
+        if uri not in self.watched_uris:
+            self.watched_uris.append(uri)
+
     @property
     def should_run_ws(self) -> bool:
         return True
 
 
 class Connector(BaseConnector):
-    def __init__(self, *, loop=None):
-        super().__init__(loop)
+    def __init__(self, *, loop=None, **kwargs):
+        super().__init__(loop, **kwargs)
         self._repeat_flag = True
         self.connection = None
 
@@ -45,7 +150,7 @@ class Connector(BaseConnector):
 
     @property
     def should_run_ws(self) -> bool:
-        return len(self.ws.registered_uris) > 0
+        return len(self.ws.registered_uris) > 0 or len(self.watched_uris) > 0
 
     def start(self) -> None:
         """Starts the connector. This method should be overridden if different behavior is required.
@@ -53,23 +158,20 @@ class Connector(BaseConnector):
         :rtype: None
         """
         try:
-            def wrapper():
-                process = next(_return_ux_process(), None)
-                while not process:
-                    process = next(_return_ux_process(), None)
-                    time.sleep(0.5)
+            while True:
+                process = self.loop.run_until_complete(self.discovery.wait_for_client())
 
                 connection = Connection(self, process)
                 self.register_connection(connection)
                 self.loop.run_until_complete(connection.init())
 
-                if self._repeat_flag and len(self.ws.registered_uris) > 0:
-                    logger.debug('Repeat flag=True. Looking for new clients.')
-                    wrapper()
-
-            wrapper()
+                if not self._repeat_flag or not self.should_run_ws:
+                    break
+                logger.debug('Repeat flag=True. Looking for new clients.')
         except KeyboardInterrupt:
             logger.info('Event loop interrupted by keyboard')
+        self.loop.run_until_complete(self.dispatcher.close())
+        shutdown_executors()
         self.loop.close()
 
     async def stop(self) -> None:
@@ -82,48 +184,109 @@ class Connector(BaseConnector):
             await self.connection._close()
 
 
+class _Shard:
+    """Event loop running in its own thread, hosting some of the connections"""
+
+    def __init__(self, index: int):
+        self.loop = asyncio.new_event_loop()
+        self.connections = 0
+        self._thread = threading.Thread(target=self._run, name=f'lcu-driver-shard-{index}', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def run(self, coro):
+        """Run a coroutine in the shard loop and wait for it from the calling loop."""
+        self.connections += 1
+        try:
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+        finally:
+            self.connections -= 1
+
+    def stop(self, dispatcher: Dispatcher) -> None:
+        asyncio.run_coroutine_threadsafe(dispatcher.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
 class MultipleClientConnector(BaseConnector):
-    def __init__(self, *, loop=None):
-        super().__init__(loop=loop)
-        self.connections = []
+    """Connector handling every running client
+
+    :param int shards: Number of event loops, each one running in its own thread, the connections are spread across.
+        By default every connection runs in the connector loop.
+    """
+    def __init__(self, *, loop=None, shards=1, **kwargs):
+        super().__init__(loop=loop, **kwargs)
+        self.connections: Dict[int, Connection] = {}
+        self._tasks: Dict[int, asyncio.Future] = {}
+        self._shard_count = shards
+        self._shards: List[_Shard] = []
 
     def register_connection(self, connection):
-        self.connections.append(connection)
+        self.connections[connection.lcu_pid] = connection
 
     def unregister_connection(self, lcu_pid):
-        for index, connection in enumerate(self.connections):
-            if connection.pid == lcu_pid:
-                del connection[index]
+        self.connections.pop(lcu_pid, None)
 
     @property
     def should_run_ws(self) -> bool:
         return True
 
     def _process_was_initialized(self, non_initialized_connection):
-        for connection in self.connections:
-            if non_initialized_connection.pid == connection.pid:
-                return True
-        return False
+        lcu_pid = non_initialized_connection.lcu_pid
+        return lcu_pid in self.connections or lcu_pid in self._tasks
+
+    async def _run_connection(self, connection: Connection) -> None:
+        """Run a connection until it closes without letting its failures reach the other connections."""
+        try:
+            if self._shards:
+                shard = min(self._shards, key=lambda shard: shard.connections)
+                await shard.run(connection.init())
+            else:
+                await connection.init()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('Connection to the client with pid %s failed', connection.lcu_pid)
+        finally:
+            self.unregister_connection(connection.lcu_pid)
 
     async def _astart(self):
-        tasks = []
+        if self._shard_count > 1:
+            self._shards = [_Shard(index) for index in range(self._shard_count)]
+
         try:
-            while True:
-                process_iter = _return_ux_process()
+            async for event in self.discovery:
+                if event.kind != 'appear':
+                    continue
+
+                try:
+                    connection = Connection(self, event.process)
+                except (Error, KeyError, ValueError):
+                    logger.exception('Unable to read the connection details of the client with pid %s', event.pid)
+                    # e.g. the client hasn't written its arguments yet
+                    self.discovery.retry(event.pid)
+                    continue
 
-                process = next(process_iter, None)
-                while process:
-                    connection = Connection(self, process)
-                    if not self._process_was_initialized(connection):
-                        tasks.append(asyncio.create_task(connection.init()))
+                if self._process_was_initialized(connection):
+                    continue
 
-                    process = next(process_iter, None)
-                await asyncio.sleep(0.5)
+                task = asyncio.ensure_future(self._run_connection(connection))
+                self._tasks[connection.lcu_pid] = task
+                task.add_done_callback(lambda _, lcu_pid=connection.lcu_pid: self._tasks.pop(lcu_pid, None))
 
         except KeyboardInterrupt:
             logger.info('Event loop interrupted by keyboard')
         finally:
-            await asyncio.gather(*tasks)
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            await self.dispatcher.close()
+            for shard in self._shards:
+                shard.stop(self.dispatcher)
+            self._shards = []
+            shutdown_executors()
 
     def start(self) -> None:
         self.loop.run_until_complete(self._astart())
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from psutil import STATUS_ZOMBIE, AccessDenied, NoSuchProcess, Process, ZombieProcess, pids
+
+from .utils import _is_ux_process, parse_cmdline_args
+
+logger = logging.getLogger('lcu-driver')
+
+if sys.platform == 'win32':
+    DEFAULT_LOCKFILES = ('C:\\Riot Games\\League of Legends\\lockfile',)
+elif sys.platform == 'darwin':
+    DEFAULT_LOCKFILES = ('/Applications/League of Legends.app/Contents/LoL/lockfile',)
+else:
+    DEFAULT_LOCKFILES = ()
+
+
+class ClientEvent:
+    """A League Client appeared or disappeared
+
+    .. py:attribute:: kind
+
+        appear or disappear
+    .. py:attribute:: process
+
+        :py:obj:`psutil.Process` of the LeagueClientUx process
+    """
+    def __init__(self, kind: str, process: Process):
+        self.kind = kind
+        self.process = process
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+
+class _ProcessScanner:
+    """Find the LeagueClientUx processes, remembering the processes that aren't so they're not inspected again.
+
+    Processes younger than **settle_time** are inspected on every scan since their name and command line may still
+    change, e.g. while wine starts the executable.
+    """
+    def __init__(self, settle_time: float = 10.0):
+        self.settle_time = settle_time
+        # creation time of each ignored process, None when it couldn't be read
+        self._ignored: Dict[int, Optional[float]] = {}
+        self._forget = False
+
+    def forget(self) -> None:
+        # scans run in a thread, the ignored processes are dropped by the next one
+        self._forget = True
+
+    @staticmethod
+    def _create_time(process: Optional[Process]) -> Optional[float]:
+        try:
+            return process.create_time() if process is not None else None
+        except (AccessDenied, NoSuchProcess, ZombieProcess):
+            return None
+
+    def _still_ignored(self, pid: int) -> bool:
+        created = self._ignored[pid]
+        if created is None:
+            return True
+        try:
+            # a pid reused by a new process must be inspected again
+            return Process(pid).create_time() == created
+        except (AccessDenied, NoSuchProcess, ZombieProcess):
+            return True
+
+    def scan(self) -> Dict[int, Process]:
+        found = {}
+        alive = pids()
+        ignored = self._ignored
+        now = time.time()
+
+        if self._forget:
+            self._forget = False
+            ignored.clear()
+        for pid in ignored.keys() - set(alive):
+            ignored.pop(pid, None)
+
+        for pid in alive:
+            if pid in ignored:
+                if self._still_ignored(pid):
+                    continue
+                ignored.pop(pid, None)
+
+            process = None
+            try:
+                process = Process(pid)
+                if process.status() == STATUS_ZOMBIE:
+                    continue
+                if _is_ux_process(process):
+                    found[pid] = process
+                elif now - process.create_time() > self.settle_time:
+                    ignored[pid] = process.create_time()
+            except AccessDenied:
+                ignored[pid] = self._create_time(process)
+            except (NoSuchProcess, ZombieProcess):
+                continue
+        return found
+
+
+class ClientDiscovery:
+    """Detect League Clients starting and closing
+
+    Processes are scanned in a thread. Known non League processes are skipped, so only new processes are inspected.
+    The lockfile of every known League installation is checked for changes every **interval** seconds, which is a
+    single ``stat`` call per file. While at least one installation is known, scans run on lockfile changes and every
+    **idle_interval** seconds. Otherwise they run every **interval** seconds.
+
+    :param interval: Seconds between lockfile checks, or between scans when no installation is known
+    :param idle_interval: Seconds between scans while lockfiles are watched
+    :param lockfiles: Lockfile paths to watch besides the default installation paths and the ones learned from the
+        detected clients
+    """
+    def __init__(self, *, interval: float = 0.5, idle_interval: float = 5.0, lockfiles: Iterable[str] = ()):
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self._lockfiles: List[str] = list(DEFAULT_LOCKFILES) + list(lockfiles)
+        self._scanner = _ProcessScanner()
+        self._watching = False
+        self._retry: Set[int] = set()
+
+    def retry(self, pid: int) -> None:
+        """Report the client with this pid as appearing again on the next scan, e.g. when it couldn't be used."""
+        self._retry.add(pid)
+
+    def _learn_lockfile(self, process: Process) -> None:
+        try:
+            install_directory = parse_cmdline_args(process.cmdline()).get('install-directory')
+        except (AccessDenied, NoSuchProcess, ZombieProcess):
+            return
+
+        if install_directory is not None:
+            lockfile = os.path.join(install_directory, 'lockfile')
+            if lockfile not in self._lockfiles:
+                self._lockfiles.append(lockfile)
+
+    async def _watch_lockfiles(self, wake: asyncio.Event) -> None:
+        states = {}
+        while True:
+            changed = False
+            watching = False
+            for lockfile in self._lockfiles:
+                try:
+                    stat = os.stat(lockfile)
+                    state = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    state = None
+
+                watching = watching or os.path.isdir(os.path.dirname(lockfile))
+                if states.get(lockfile, None) != state:
+                    changed = changed or lockfile in states
+                    states[lockfile] = state
+
+            self._watching = watching
+            if changed:
+                # a new client may reuse the pid of a process seen before
+                self._scanner.forget()
+                wake.set()
+            await asyncio.sleep(self.interval)
+
+    async def events(self) -> AsyncIterator[ClientEvent]:
+        """Yield an event every time a client appears or disappears, clients running already are reported first."""
+        loop = asyncio.get_event_loop()
+        wake = asyncio.Event()
+        watcher = asyncio.ensure_future(self._watch_lockfiles(wake))
+        known: Dict[int, Process] = {}
+
+        try:
+            while True:
+                found = await loop.run_in_executor(None, self._scanner.scan)
+                while self._retry:
+                    known.pop(self._retry.pop(), None)
+
+                for pid in found.keys() - known.keys():
+                    self._learn_lockfile(found[pid])
+                    logger.debug('Client with pid %s found', pid)
+                    yield ClientEvent('appear', found[pid])
+                for pid in known.keys() - found.keys():
+                    logger.debug('Client with pid %s closed', pid)
+                    yield ClientEvent('disappear', known[pid])
+                known = found
+
+                try:
+                    await asyncio.wait_for(wake.wait(), self.idle_interval if self._watching else self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+        finally:
+            watcher.cancel()
+
+    def __aiter__(self) -> AsyncIterator[ClientEvent]:
+        return self.events()
+
+    async def wait_for_client(self) -> Process:
+        """Return the process of the first client found."""
+        events = self.events()
+        try:
+            async for event in events:
+                if event.kind == 'appear':
+                    return event.process
+        finally:
+            await events.aclose()
+
+    def find_clients(self) -> Dict[int, Process]:
+        """Scan the running clients once, blocking.
+
+        :rtype: dict
+        """
+        return self._scanner.scan()
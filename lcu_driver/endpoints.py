@@ -0,0 +1,285 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+logger = logging.getLogger('lcu-driver')
+
+METHODS = ('get', 'post', 'put', 'patch', 'delete',)
+
+_PARAMETER = re.compile(r'{(\w+)}')
+_VERSION = re.compile(r'v\d+$')
+_CAMEL_CASE = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+_UNRESERVED = re.compile(r'[\w.~-]*\Z', re.ASCII)
+
+
+def _quote(value: Any) -> str:
+    text = str(value)
+    # ids are by far the most common parameters and never need quoting
+    return text if _UNRESERVED.match(text) else quote(text, safe='')
+
+
+def _compile(path: str) -> Tuple[Tuple[str, ...], Callable[..., str]]:
+    """Return the parameter names of a path template and a function building the path from their values."""
+    parts = _PARAMETER.split(path)
+    literals, names = parts[0::2], tuple(parts[1::2])
+
+    if not names:
+        return names, lambda: path
+    if len(names) == 1:
+        prefix, suffix = literals
+
+        def build_one(value):
+            return prefix + _quote(value) + suffix
+        return names, build_one
+
+    def build(*values):
+        pieces = [literals[0]]
+        for value, literal in zip(values, literals[1:]):
+            pieces.append(_quote(value))
+            pieces.append(literal)
+        return ''.join(pieces)
+    return names, build
+
+
+def endpoint_name(method: str, path: str) -> Tuple[str, str]:
+    """Return the plugin and method names an endpoint is exposed under.
+
+    ``GET /lol-summoner/v1/summoners/{id}`` is ``lol_summoner.summoners_by_id`` and other methods are prefixed with
+    their name, e.g. ``PUT /lol-summoner/v1/current-summoner/icon`` is ``lol_summoner.put_current_summoner_icon``.
+    """
+    segments = [segment for segment in path.strip('/').split('/') if segment]
+    plugin = segments[0] if segments else 'root'
+    words, parameters = [], []
+    for segment in segments[1:]:
+        match = _PARAMETER.fullmatch(segment)
+        if match is not None:
+            parameters.append(_CAMEL_CASE.sub('_', match.group(1)).lower())
+        elif not _VERSION.match(segment):
+            words.append(segment)
+
+    name = '_'.join(words) or 'resource'
+    if parameters:
+        name += '_by_' + '_and_'.join(parameters)
+    if method.lower() != 'get':
+        name = f'{method.lower()}_{name}'
+    return re.sub(r'\W', '_', plugin), re.sub(r'\W', '_', name)
+
+
+class Endpoint:
+    """An API endpoint
+
+    :param method: HTTP method
+    :param path: Path template, parameters between braces, e.g. ``/lol-summoner/v1/summoners/{id}``
+    :param name: Method name, derived from the method and the path by default
+    :param description: Shown as the method documentation
+
+    .. py:attribute:: parameters
+
+        Names of the path parameters in order
+    """
+    __slots__ = ('method', 'path', 'plugin', 'name', 'description', 'parameters', 'build',)
+
+    def __init__(self, method: str, path: str, *, name: Optional[str] = None, description: Optional[str] = None):
+        self.method = method.upper()
+        self.path = path
+        self.plugin, default_name = endpoint_name(method, path)
+        self.name = name or default_name
+        self.description = description
+        self.parameters, self.build = _compile(path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'method': self.method, 'path': self.path, 'name': self.name, 'description': self.description}
+
+    def __repr__(self):
+        return f'<Endpoint {self.method} {self.path}>'
+
+
+class EndpointRegistry:
+    """Endpoints grouped by plugin, exposed on every connection as :py:attr:`lcu_driver.connection.Connection.endpoints`
+
+    The default registry holds the endpoints in :py:obj:`BUILTIN_ENDPOINTS`. The complete one can be generated from
+    the client schema with :meth:`from_client`.
+
+    :param endpoints: Initial endpoints
+    """
+    def __init__(self, endpoints: Iterable[Endpoint] = ()):
+        self.plugins: Dict[str, Dict[str, Endpoint]] = {}
+        for endpoint in endpoints:
+            self.add(endpoint)
+
+    def add(self, endpoint: Endpoint) -> Endpoint:
+        """Register an endpoint, another version of an endpoint already registered gets its version appended to its
+        name."""
+        methods = self.plugins.setdefault(endpoint.plugin, {})
+        existing = methods.get(endpoint.name)
+        if existing is not None and (existing.method, existing.path) != (endpoint.method, endpoint.path):
+            versions = [segment for segment in endpoint.path.split('/') if _VERSION.match(segment)]
+            endpoint.name = f'{endpoint.name}_{versions[0] if versions else len(methods)}'
+        methods[endpoint.name] = endpoint
+        return endpoint
+
+    def __iter__(self):
+        for methods in self.plugins.values():
+            yield from methods.values()
+
+    def __len__(self):
+        return sum(len(methods) for methods in self.plugins.values())
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, Any]) -> 'EndpointRegistry':
+        """Create a registry from an OpenAPI or Swagger schema."""
+        registry = cls()
+        for path, operations in sorted(schema.get('paths', {}).items()):
+            for method, operation in operations.items():
+                if method.lower() in METHODS:
+                    registry.add(Endpoint(method, path, description=(operation or {}).get('summary') or None))
+        return registry
+
+    def save(self, path: str, version: Optional[str] = None) -> None:
+        """Write the registry to a JSON file, along with the client version it was generated from."""
+        with open(path, 'w') as file:
+            json.dump({'version': version, 'endpoints': [endpoint.to_dict() for endpoint in self]}, file)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple['EndpointRegistry', Optional[str]]:
+        """Read a registry written by :meth:`save`.
+
+        :return: The registry and the client version it was generated from
+        """
+        with open(path) as file:
+            content = json.load(file)
+        endpoints = (Endpoint(item['method'], item['path'], name=item['name'], description=item.get('description'))
+                     for item in content['endpoints'])
+        return cls(endpoints), content.get('version')
+
+    @classmethod
+    async def from_client(cls, connection, cache_path: Optional[str] = None) -> 'EndpointRegistry':
+        """Generate a registry from the schema the client serves.
+
+        The client only serves its schema when swagger is enabled in its settings. With **cache_path** the registry is
+        saved to disk and loaded from it until the client is updated, so the schema isn't fetched on every start.
+
+        :param connection: Connection to the client
+        :param cache_path: File the registry is cached in
+        :raises: :py:obj:`RuntimeError` when the client doesn't serve its schema
+        """
+        response = await connection.request('get', '/system/v1/builds', cache=False)
+        version = (await response.json()).get('version') if response.status == 200 else None
+        response.release()
+
+        if cache_path is not None and os.path.exists(cache_path):
+            try:
+                registry, cached_version = cls.load(cache_path)
+            except (OSError, ValueError, KeyError):
+                logger.warning('Ignoring the invalid endpoints cache %s', cache_path)
+            else:
+                if version is not None and cached_version == version:
+                    return registry
+
+        for schema_endpoint in ('/swagger/v3/openapi.json', '/swagger/v2/swagger.json',):
+            response = await connection.request('get', schema_endpoint, cache=False)
+            if response.status == 200:
+                registry = cls.from_schema(await response.json())
+                break
+            response.release()
+        else:
+            raise RuntimeError('The client doesn\'t serve its schema, enable swagger in its settings.')
+
+        if cache_path is not None:
+            registry.save(cache_path, version)
+        return registry
+
+
+class _PluginClient:
+    """Methods of the endpoints of one plugin bound to a connection"""
+
+    def __init__(self, connection, plugin: str, endpoints: Dict[str, Endpoint]):
+        self._connection = connection
+        self._plugin = plugin
+        self._endpoints = endpoints
+
+    def __getattr__(self, name: str):
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            raise AttributeError(f'Plugin {self._plugin} has no endpoint {name}')
+
+        connection = self._connection
+        build = endpoint.build
+        method = endpoint.method
+        template = endpoint.path
+        parameters = endpoint.parameters
+
+        async def call(*args, cache: bool = True, **kwargs):
+            if len(args) > len(parameters):
+                raise TypeError(f'{name}() takes {len(parameters)} path parameters but {len(args)} were given')
+            if len(args) < len(parameters):
+                try:
+                    args += tuple(kwargs.pop(parameter) for parameter in parameters[len(args):])
+                except KeyError as e:
+                    raise TypeError(f'{name}() missing the path parameter {e}') from None
+            if 'path' in kwargs:
+                raise TypeError(f'{name}() takes its path parameters as arguments, not as path')
+            return await connection._request(method, connection._produce_url(build(*args)), template, cache, kwargs)
+
+        call.__name__ = name
+        call.__doc__ = endpoint.description or f'{method} {template}'
+        # bound once, later accesses skip __getattr__
+        setattr(self, name, call)
+        return call
+
+    def __dir__(self):
+        return list(self._endpoints)
+
+
+class EndpointClient:
+    """Plugins of a registry bound to a connection, e.g. ``client.lol_summoner.current_summoner()``
+
+    Path parameters are given positionally or by name, the other keyword arguments are the ones of
+    :meth:`lcu_driver.connection.Connection.request`.
+    """
+    def __init__(self, connection, registry: EndpointRegistry):
+        self.registry = registry
+        self._connection = connection
+
+    def __getattr__(self, plugin: str) -> _PluginClient:
+        endpoints = self.registry.plugins.get(plugin)
+        if endpoints is None:
+            raise AttributeError(f'No endpoint registered for plugin {plugin}')
+        client = _PluginClient(self._connection, plugin, endpoints)
+        setattr(self, plugin, client)
+        return client
+
+    def __dir__(self):
+        return list(self.registry.plugins)
+
+
+BUILTIN_ENDPOINTS: List[Endpoint] = [
+    Endpoint('get', '/riotclient/region-locale', name='region_locale'),
+    Endpoint('get', '/system/v1/builds', name='builds'),
+    Endpoint('get', '/lol-summoner/v1/current-summoner'),
+    Endpoint('get', '/lol-summoner/v1/summoners/{id}'),
+    Endpoint('get', '/lol-summoner/v2/summoners/puuid/{puuid}', name='summoners_by_puuid'),
+    Endpoint('put', '/lol-summoner/v1/current-summoner/icon'),
+    Endpoint('get', '/lol-gameflow/v1/session'),
+    Endpoint('get', '/lol-gameflow/v1/gameflow-phase'),
+    Endpoint('get', '/lol-lobby/v2/lobby'),
+    Endpoint('post', '/lol-lobby/v2/lobby'),
+    Endpoint('delete', '/lol-lobby/v2/lobby'),
+    Endpoint('post', '/lol-lobby/v2/lobby/matchmaking/search'),
+    Endpoint('delete', '/lol-lobby/v2/lobby/matchmaking/search'),
+    Endpoint('get', '/lol-matchmaking/v1/search'),
+    Endpoint('get', '/lol-matchmaking/v1/ready-check'),
+    Endpoint('post', '/lol-matchmaking/v1/ready-check/accept'),
+    Endpoint('post', '/lol-matchmaking/v1/ready-check/decline'),
+    Endpoint('get', '/lol-champ-select/v1/session'),
+    Endpoint('patch', '/lol-champ-select/v1/session/actions/{id}'),
+    Endpoint('post', '/lol-champ-select/v1/session/actions/{id}/complete'),
+    Endpoint('get', '/lol-chat/v1/me'),
+    Endpoint('put', '/lol-chat/v1/me'),
+    Endpoint('get', '/lol-chat/v1/friends'),
+    Endpoint('get', '/lol-match-history/v1/products/lol/current-summoner/matches'),
+    Endpoint('get', '/lol-ranked/v1/current-ranked-stats'),
+]
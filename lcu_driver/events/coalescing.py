@@ -0,0 +1,55 @@
+import asyncio
+from typing import Callable
+
+COALESCE_MODES = ('latest', 'drop',)
+
+
+class Coalescer:
+    """Throttle the invocations of a websocket handler, per connection and URI
+
+    In **latest** mode the first event of a URI starts a window of **window** seconds, the handler is then called once
+    with the last event received during it. In **drop** mode events are dropped while the handler is still running
+    for a previous event of the same URI.
+
+    .. py:attribute:: coalesced
+
+        Events replaced by a more recent one in **latest** mode
+    .. py:attribute:: dropped
+
+        Events dropped in **drop** mode
+    """
+    def __init__(self, mode: str, window: float, invoke: Callable):
+        if mode not in COALESCE_MODES:
+            raise RuntimeError(f'Coalesce mode {mode} not recognized.')
+
+        self.mode = mode
+        self.window = window
+        self.coalesced = 0
+        self.dropped = 0
+        self._invoke = invoke
+        self._pending = {}
+        self._running = set()
+        self._tasks = set()
+
+    async def offer(self, event: dict, connection, response) -> None:
+        key = (connection, response.uri)
+        if self.mode == 'latest':
+            if key in self._pending:
+                self._pending[key] = response
+                self.coalesced += 1
+                return
+
+            self._pending[key] = response
+            asyncio.get_event_loop().call_later(self.window, self._flush, event, connection, key)
+        else:
+            if key in self._running:
+                self.dropped += 1
+                return
+
+            self._running.add(key)
+            await self._invoke(event, connection, response, on_done=lambda: self._running.discard(key))
+
+    def _flush(self, event: dict, connection, key) -> None:
+        task = asyncio.ensure_future(self._invoke(event, connection, self._pending.pop(key)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,96 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Patch = List[Dict[str, Any]]
+
+_MISSING = object()
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _diff(old: Any, new: Any, path: str, patch: Patch) -> None:
+    if type(old) is not type(new):
+        patch.append({'op': 'replace', 'path': path, 'value': new})
+    elif isinstance(new, dict):
+        for key, value in old.items():
+            child = f'{path}/{_escape(key)}'
+            new_value = new.get(key, _MISSING)
+            if new_value is _MISSING:
+                patch.append({'op': 'remove', 'path': child})
+            elif new_value is not value:
+                _diff(value, new_value, child, patch)
+        for key, value in new.items():
+            if key not in old:
+                patch.append({'op': 'add', 'path': f'{path}/{_escape(key)}', 'value': value})
+    elif isinstance(new, list):
+        common = min(len(old), len(new))
+        for index in range(common):
+            _diff(old[index], new[index], f'{path}/{index}', patch)
+        for index in range(common, len(new)):
+            patch.append({'op': 'add', 'path': f'{path}/{index}', 'value': new[index]})
+        # from the end so the indexes of the remaining items don't shift
+        for index in range(len(old) - 1, common - 1, -1):
+            patch.append({'op': 'remove', 'path': f'{path}/{index}'})
+    elif old != new:
+        patch.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def json_patch(old: Any, new: Any) -> Patch:
+    """Return the JSON Patch (RFC 6902) operations turning **old** into **new**.
+
+    Objects are compared key by key and arrays index by index, items appended to or removed from the end of an array
+    are single operations.
+    """
+    patch = []
+    _diff(old, new, '', patch)
+    return patch
+
+
+def paths_changed(patch: Patch, paths: Iterable[str]) -> bool:
+    """Return whether the patch modifies any of the JSON pointers, a value inside them or one containing them."""
+    for operation in patch:
+        changed = operation['path']
+        for path in paths:
+            if (changed == path or changed.startswith(path + '/')
+                    or path.startswith(changed + '/') or not changed):
+                return True
+    return False
+
+
+class DiffTracker:
+    """Last value of each resource per connection and URI, to compute what every event changed
+
+    .. py:attribute:: tracked
+
+        Number of resources whose last value is kept
+    """
+    def __init__(self):
+        # grouped per connection so forgetting one is a single pop, connections may run in other threads
+        self._values: Dict[Any, Dict[str, Any]] = {}
+
+    @property
+    def tracked(self) -> int:
+        return sum(len(values) for values in list(self._values.values()))
+
+    def update(self, connection, uri: str, event_type: str, data: Any) -> Tuple[Any, Patch]:
+        """Store the value carried by an event.
+
+        :return: The previous value, None when it isn't known, and the patch turning it into the new one
+        """
+        values = self._values.setdefault(connection, {})
+        previous = values.pop(uri, _MISSING)
+        if event_type.upper() == 'DELETE':
+            return None if previous is _MISSING else previous, [{'op': 'remove', 'path': ''}]
+
+        values[uri] = data
+        if previous is _MISSING:
+            return None, [{'op': 'add', 'path': '', 'value': data}]
+        return previous, json_patch(previous, data)
+
+    def forget(self, connection: Optional[Any] = None) -> None:
+        """Drop the values kept for a connection, or for every connection."""
+        if connection is None:
+            self._values.clear()
+        else:
+            self._values.pop(connection, None)
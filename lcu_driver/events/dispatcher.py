@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from ..metrics import NULL_METRICS, Metrics
+
+logger = logging.getLogger('lcu-driver')
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest',)
+
+
+class DispatchStats:
+    """Counters of a :py:obj:`Dispatcher`
+
+    .. py:attribute:: submitted
+    .. py:attribute:: completed
+    .. py:attribute:: failed
+
+        Handler calls that raised
+    .. py:attribute:: dropped
+
+        Handler calls discarded because the queue was full
+    .. py:attribute:: handler_time
+
+        Total seconds spent running handlers
+    .. py:attribute:: max_handler_time
+    .. py:attribute:: queue_lag
+
+        Total seconds handler calls waited before starting
+    .. py:attribute:: max_queue_lag
+    """
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.handler_time = 0.0
+        self.max_handler_time = 0.0
+        self.queue_lag = 0.0
+        self.max_queue_lag = 0.0
+        # connections running in shard threads share the dispatcher
+        self._lock = threading.Lock()
+
+    def count(self, counter: str) -> None:
+        """Increment submitted, failed or dropped."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def completed_call(self, elapsed: float, lag: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.handler_time += elapsed
+            self.queue_lag += lag
+            if elapsed > self.max_handler_time:
+                self.max_handler_time = elapsed
+            if lag > self.max_queue_lag:
+                self.max_queue_lag = lag
+
+    @property
+    def mean_handler_time(self) -> float:
+        return self.handler_time / self.completed if self.completed else 0.0
+
+    @property
+    def mean_queue_lag(self) -> float:
+        return self.queue_lag / self.completed if self.completed else 0.0
+
+
+class _Job:
+    __slots__ = ('handler', 'args', 'on_done', 'submitted',)
+
+    def __init__(self, handler, args, on_done, submitted):
+        self.handler = handler
+        self.args = args
+        self.on_done = on_done
+        self.submitted = submitted
+
+    def finish(self) -> None:
+        if self.on_done is not None:
+            self.on_done()
+
+
+class _LoopState:
+    """Queue, workers and tasks of a dispatcher in one event loop"""
+
+    def __init__(self):
+        self.tasks = set()
+        self.queue = deque()
+        self.workers = []
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.semaphores = {}
+
+
+class Dispatcher:
+    """Run event handlers, keeping a reference to every call and capturing their exceptions
+
+    Without **workers** each handler call runs in its own task. With **workers** the calls are queued and run by that
+    many worker tasks. When the queue is full **overflow** decides what happens: **block** makes the websocket reader
+    wait, **drop_oldest** discards the oldest queued call and **drop_newest** discards the new one.
+
+    Connections running in different event loops get their own queue and workers.
+
+    :param workers: Number of worker tasks or None to run every call in its own task
+    :param queue_size: Maximum number of queued calls when using workers
+    :param overflow: block, drop_oldest or drop_newest
+    :param handler_concurrency: Maximum number of simultaneous calls of the same handler
+    :param on_error: Called with the exception, the handler and its arguments when a handler raises. Defaults to
+        logging the exception.
+    :param metrics: Registry recording the handler durations, queue lags and dropped calls
+
+    .. py:attribute:: stats
+
+        :py:obj:`DispatchStats` of the dispatcher
+    """
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 1000, overflow: str = 'block',
+                 handler_concurrency: Optional[int] = None, on_error: Optional[Callable] = None,
+                 metrics: Metrics = NULL_METRICS):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Overflow policy {overflow} not recognized.')
+        if workers is not None and workers < 1:
+            raise ValueError('At least one worker is needed to run the handlers')
+        if queue_size < 1:
+            raise ValueError('The queue must hold at least one handler call')
+
+        self.workers = workers
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.handler_concurrency = handler_concurrency
+        self.on_error = on_error or self._log_error
+        self.stats = DispatchStats()
+        self.metrics = metrics
+
+        self._states = {}
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of handler calls waiting for a worker"""
+        return sum(len(state.queue) for state in list(self._states.values()))
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_event_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+    @staticmethod
+    def _handler_name(handler) -> str:
+        return getattr(handler, '__qualname__', repr(handler))
+
+    @staticmethod
+    def _log_error(exception, handler, args) -> None:
+        logger.error('Handler %s raised an exception', Dispatcher._handler_name(handler),
+                     exc_info=(type(exception), exception, exception.__traceback__))
+
+    async def submit(self, handler, *args, on_done: Optional[Callable[[], None]] = None) -> None:
+        """Schedule a handler call.
+
+        :param handler: Coroutine function
+        :param args: Handler arguments
+        :param on_done: Called once the call finished or was dropped
+        """
+        job = _Job(handler, args, on_done, time.perf_counter())
+        state = self._state()
+        self.stats.count('submitted')
+
+        if self.workers is None:
+            task = asyncio.ensure_future(self._run(job, state))
+            state.tasks.add(task)
+            task.add_done_callback(state.tasks.discard)
+            return
+
+        if not state.workers:
+            state.workers = [asyncio.ensure_future(self._worker(state)) for _ in range(self.workers)]
+
+        queue = state.queue
+        while len(queue) >= self.queue_size:
+            if self.overflow == 'drop_newest':
+                self._drop(job)
+                return
+            if self.overflow == 'drop_oldest':
+                self._drop(queue.popleft())
+                break
+            state.not_full.clear()
+            await state.not_full.wait()
+
+        queue.append(job)
+        state.not_empty.set()
+
+    def _drop(self, job: _Job) -> None:
+        self.stats.count('dropped')
+        if self.metrics.enabled:
+            self.metrics.inc('lcu_handler_dropped_total', handler=self._handler_name(job.handler))
+        job.finish()
+
+    async def _worker(self, state: _LoopState) -> None:
+        queue = state.queue
+        while True:
+            while not queue:
+                state.not_empty.clear()
+                await state.not_empty.wait()
+
+            job = queue.popleft()
+            if job is None:
+                return
+            state.not_full.set()
+            await self._run(job, state)
+
+    async def _run(self, job: _Job, state: _LoopState) -> None:
+        semaphore = None
+        if self.handler_concurrency is not None:
+            semaphore = state.semaphores.get(job.handler)
+            if semaphore is None:
+                semaphore = state.semaphores[job.handler] = asyncio.Semaphore(self.handler_concurrency)
+            await semaphore.acquire()
+
+        start = time.perf_counter()
+        lag = start - job.submitted
+        try:
+            await job.handler(*job.args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats.count('failed')
+            if self.metrics.enabled:
+                self.metrics.inc('lcu_handler_errors_total', handler=self._handler_name(job.handler))
+            self.on_error(e, job.handler, job.args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if semaphore is not None:
+                semaphore.release()
+
+            self.stats.completed_call(elapsed, lag)
+            if self.metrics.enabled:
+                name = self._handler_name(job.handler)
+                self.metrics.observe('lcu_handler_seconds', elapsed, handler=name)
+                self.metrics.observe('lcu_handler_queue_lag_seconds', lag, handler=name)
+            job.finish()
+
+    async def close(self) -> None:
+        """Wait for the running handler calls of the current event loop and stop its workers, queued calls are
+        discarded."""
+        state = self._states.pop(asyncio.get_event_loop(), None)
+        if state is None:
+            return
+
+        for job in state.queue:
+            self._drop(job)
+        state.queue.clear()
+
+        if state.workers:
+            # one stop marker per worker, each worker finishes its current call first
+            state.queue.extend([None] * len(state.workers))
+            state.not_empty.set()
+        await asyncio.gather(*state.workers, *state.tasks, return_exceptions=True)
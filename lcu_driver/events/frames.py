@@ -0,0 +1,49 @@
+import json
+import re
+from typing import Optional
+
+from lcu_driver.events.responses import WebsocketEventResponse
+
+# The client serializes events as [8, "<topic>", {"data": ..., "eventType": "...", "uri": "..."}], these patterns
+# locate the data payload and read the event type and uri without parsing the payload.
+_FRAME_HEAD = re.compile(r'\s*\[\s*8\s*,\s*"[^"\\]*"\s*,\s*\{\s*"data"\s*:')
+_FRAME_TAIL = re.compile(r'"eventType"\s*:\s*"(\w+)"\s*,\s*"uri"\s*:\s*"((?:[^"\\]|\\.)*)"\s*}\s*]\s*\Z')
+
+
+def parse_event_frame(frame: str, codec) -> Optional[WebsocketEventResponse]:
+    """Parse a websocket TEXT frame into an event, leaving its payload undecoded when possible.
+
+    Frames not following the client serialization order are fully decoded instead.
+
+    :param frame: Raw frame text
+    :param codec: Codec used to decode the frame and, on access, the event payload
+    :return: The event or None when the frame isn't an event
+    :raises: the codec errors when the frame has to be fully decoded and isn't valid JSON
+    """
+    head = _FRAME_HEAD.match(frame)
+    if head is not None:
+        tail_start = frame.rfind('"eventType"')
+        separator = frame.rfind(',', head.end(), tail_start)
+        tail = _FRAME_TAIL.match(frame, tail_start) if separator != -1 and tail_start != -1 else None
+
+        if tail is not None and not frame[separator + 1:tail_start].strip():
+            uri = tail.group(2)
+            if '\\' in uri:
+                uri = json.loads(f'"{uri}"')
+            return WebsocketEventResponse(
+                event_type=tail.group(1),
+                uri=uri,
+                raw_data=frame[head.end():separator],
+                codec=codec,
+            )
+
+    message = codec.loads(frame)
+    if not isinstance(message, list) or len(message) < 3 or message[0] != 8:
+        return None
+
+    payload = message[2]
+    return WebsocketEventResponse(
+        event_type=payload['eventType'],
+        uri=payload['uri'],
+        data=payload['data'],
+    )
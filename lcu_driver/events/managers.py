@@ -1,8 +1,21 @@
 import asyncio
 from abc import ABC
-from typing import Union, Callable, Awaitable, Iterable
+from concurrent.futures import Executor
+from operator import itemgetter
+from typing import Union, Callable, Awaitable, Dict, Iterable, List, Optional, Set
 
-from lcu_driver.events.responses import WebsocketEventResponse
+from lcu_driver.events.coalescing import COALESCE_MODES, Coalescer
+from lcu_driver.events.diffing import DiffTracker
+from lcu_driver.events.dispatcher import Dispatcher
+from lcu_driver.events.offload import offload
+from lcu_driver.events.responses import DiffEventResponse, WebsocketEventResponse
+
+BLANKET_TOPIC = 'OnJsonApiEvent'
+
+
+def uri_topic(uri: str) -> str:
+    """Return the websocket subscription topic that delivers the events of a single URI."""
+    return BLANKET_TOPIC + uri.replace('/', '_')
 
 
 class ConnectorEventManager(ABC):
@@ -31,21 +44,66 @@ class ConnectorEventManager(ABC):
                 event(*args, **kwargs)
             )
 
+    def on(self, event_name: str, *, executor: Union[str, Executor, None] = None,
+           on_result: Optional[Callable[..., Awaitable]] = None):
+        """Register a handler for the open, ready, reconnect or close event.
+
+        :param event_name: open, ready, reconnect or close
+        :param executor: Run the handler in a **thread** pool, a **process** pool or the given executor. The handler
+            must then be a regular function, it's called with a :py:obj:`lcu_driver.events.offload.ConnectionInfo`
+            instead of the connection.
+        :type executor: str or :py:obj:`concurrent.futures.Executor`
+        :param on_result: Coroutine function called in the event loop with the connection and the value returned by a
+            handler run in an executor
+        """
+        if event_name not in ('open', 'ready', 'reconnect', 'close',):
+            raise RuntimeError(f'Event {event_name} not recognized.')
+
+        def register_wrapper(func):
+            self._set_event(event_name, offload(func, executor, on_result) if executor is not None else func)
+            return func
+        return register_wrapper
+
     def open(self, coro_func):
         return self._set_event('open', coro_func)
 
     def ready(self, coro_func):
         return self._set_event('ready', coro_func)
 
+    def reconnect(self, coro_func):
+        """Register a handler called when the websocket of a connection was reconnected, events may have been missed
+        in between."""
+        return self._set_event('reconnect', coro_func)
+
     def close(self, coro_func):
         return self._set_event('close', coro_func)
 
 
-class WebsocketEventManager(ABC):
-    """Connector Events Manager Base Class"""
+class _PrefixNode:
+    """Path segment trie node holding the handlers of trailing slash URIs"""
+    __slots__ = ('children', 'handlers',)
 
     def __init__(self):
+        self.children = {}
+        self.handlers = {}
+
+
+class WebsocketEventManager(ABC):
+    """Connector Events Manager Base Class
+
+    :param dispatcher: Runs the handlers, defaults to one task per handler call
+    :type dispatcher: :py:obj:`lcu_driver.events.dispatcher.Dispatcher`
+    """
+
+    def __init__(self, dispatcher: Optional[Dispatcher] = None):
+        self.dispatcher = dispatcher or Dispatcher()
         self._registered_uris = []
+        self._exact_index = {}
+        self._prefix_index = _PrefixNode()
+        self._sequence = 0
+        self._listeners = []
+        self.diffs = DiffTracker()
+        self._tasks = set()
 
     @property
     def registered_uris(self) -> list:
@@ -55,45 +113,255 @@ class WebsocketEventManager(ABC):
         """
         return self._registered_uris
 
-    def register(self, uri: str, *, event_types: Iterable = ('CREATE', 'UPDATE', 'DELETE',)):
+    def register(self, uri: str, *, event_types: Iterable = ('CREATE', 'UPDATE', 'DELETE',),
+                 coalesce: Optional[str] = None, window: float = 0.1, executor: Union[str, Executor, None] = None,
+                 on_result: Optional[Callable[..., Awaitable]] = None, diff: bool = False,
+                 paths: Optional[Iterable[str]] = None):
         """Register an event for the given handler.
 
         :param string uri: Endpoint to call. If the endpoint last character is a slash it will match all events starting with the endpoint.
         :param event_types: Expects an iterable. The allowed types are CREATE, UPDATE and DELETE (case-sensitive).
         :type event_types: tuple(str, str)
+        :param coalesce: Throttle the handler per URI. **latest** calls it once per **window** with the last event,
+            **drop** drops events while it's still running. See :py:obj:`lcu_driver.events.coalescing.Coalescer`.
+        :type coalesce: str or None
+        :param float window: Seconds events are coalesced for in **latest** mode
+        :param executor: Run the handler in a **thread** pool, a **process** pool or the given executor, keeping CPU
+            bound handlers off the event loop. The handler must then be a regular function, it's called with a
+            :py:obj:`lcu_driver.events.offload.ConnectionInfo` instead of the connection.
+        :type executor: str or :py:obj:`concurrent.futures.Executor`
+        :param on_result: Coroutine function called in the event loop with the connection and the value returned by a
+            handler run in an executor
+        :param bool diff: Call the handler with a :py:obj:`lcu_driver.events.responses.DiffEventResponse` holding what
+            the event changed since the previous one of the same URI, and not at all when it changed nothing. The last
+            value of each URI is kept per connection until it closes, handlers must not modify it.
+        :param paths: JSON pointers, e.g. ``('/timer/phase', '/myTeam')``, the handler is only called when the event
+            changes one of them. Implies **diff**.
         """
         allowed_events = ('CREATE', 'UPDATE', 'DELETE',)
 
         if not uri.startswith('/'):
             raise RuntimeError('every endpoint should start with a forward slash')
 
+        if coalesce is not None and coalesce not in COALESCE_MODES:
+            raise RuntimeError(f'Coalesce mode {coalesce} not recognized.')
+
+        if paths is not None:
+            paths = tuple(paths)
+            diff = True
+            for path in paths:
+                if not path.startswith('/'):
+                    raise RuntimeError(f'JSON path {path} should start with a forward slash')
+
+        if diff and coalesce is not None:
+            raise RuntimeError('diff handlers can\'t be coalesced, they would miss changes')
+
         def register_wrapper(coro_func):
-            if not asyncio.iscoroutinefunction(coro_func):
+            if executor is not None:
+                handler = offload(coro_func, executor, on_result)
+            elif not asyncio.iscoroutinefunction(coro_func):
                 raise TypeError(f'Annotated functions should be coroutines. Use \'async def\'.')
-            
+            else:
+                handler = coro_func
+
             for event in event_types:
                 if event not in allowed_events:
                     raise RuntimeError(f'Event {event} not recognized.')
 
-            self._registered_uris.append({
+            event = {
                 'uri': uri,
                 'event_types': event_types,
-                'coroutine_or_callable': coro_func
-            })
+                'coroutine_or_callable': coro_func,
+                'handler': handler,
+                'coalescer': Coalescer(coalesce, window, self._invoke) if coalesce is not None else None,
+                'diff': diff,
+                'paths': paths,
+            }
+            self._registered_uris.append(event)
+            self._index_event(event)
+            self._notify_listeners()
             return coro_func
         return register_wrapper
 
+    def unregister(self, coro_func, uri: Optional[str] = None) -> None:
+        """Remove a registered handler.
+
+        :param coro_func: Handler previously passed to :meth:`register`
+        :param uri: Only remove the handler registration for this endpoint. All registrations are removed when omitted.
+        """
+        removed = [
+            event for event in self._registered_uris
+            if event['coroutine_or_callable'] is coro_func and (uri is None or event['uri'] == uri)
+        ]
+        if not removed:
+            return
+
+        for event in removed:
+            self._registered_uris.remove(event)
+            self._unindex_event(event)
+        self._notify_listeners()
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Call `callback` every time a handler is registered or unregistered."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify_listeners(self) -> None:
+        for callback in list(self._listeners):
+            callback()
+
+    def subscription_topics(self) -> Set[str]:
+        """Return the minimal set of websocket topics covering every registered handler.
+
+        Every exact URI has its own topic. Trailing slash URIs can't be expressed as a topic, so the blanket topic is
+        used alone when at least one of them is registered.
+
+        :rtype: set
+        """
+        if any(event['uri'].endswith('/') for event in self._registered_uris):
+            return {BLANKET_TOPIC}
+        return {uri_topic(event['uri']) for event in self._registered_uris}
+
+    @staticmethod
+    def _prefix_segments(uri: str) -> List[str]:
+        """Split a trailing slash URI into the path segments it must start with."""
+        return uri[1:-1].split('/') if len(uri) > 1 else []
+
+    @staticmethod
+    def _indexed_types(event: dict) -> Iterable[str]:
+        # diff handlers see every event of their URIs so the value they are diffed against is always the last one
+        return ('CREATE', 'UPDATE', 'DELETE',) if event['diff'] else event['event_types']
+
+    def _index_event(self, event: dict) -> None:
+        """Add a registered handler to the exact URI map or to the prefix trie."""
+        event['sequence'] = self._sequence
+        self._sequence += 1
+
+        uri = event['uri']
+        if uri.endswith('/'):
+            node = self._prefix_index
+            for segment in self._prefix_segments(uri):
+                node = node.children.setdefault(segment, _PrefixNode())
+            handlers = node.handlers
+        else:
+            handlers = self._exact_index.setdefault(uri, {})
+
+        for event_type in self._indexed_types(event):
+            handlers.setdefault(event_type, []).append(event)
+
+    def _unindex_event(self, event: dict) -> None:
+        """Remove a handler from the exact URI map or from the prefix trie."""
+        uri = event['uri']
+        if uri.endswith('/'):
+            path = [self._prefix_index]
+            for segment in self._prefix_segments(uri):
+                path.append(path[-1].children[segment])
+            handlers = path[-1].handlers
+        else:
+            path = None
+            handlers = self._exact_index[uri]
+
+        for event_type in self._indexed_types(event):
+            handlers[event_type].remove(event)
+            if not handlers[event_type]:
+                del handlers[event_type]
+
+        if path is None:
+            if not handlers:
+                del self._exact_index[uri]
+            return
+
+        # prune the trie branches left without handlers
+        segments = self._prefix_segments(uri)
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.handlers or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def matching_handlers(self, uri: str, event_type: str) -> List[dict]:
+        """Return the registered handlers interested in the event, in registration order.
+
+        :param uri: URI of the received event
+        :param event_type: CREATE, UPDATE or DELETE (case-insensitive)
+        :rtype: list
+        """
+        event_type = event_type.upper()
+        matches = []
+
+        exact = self._exact_index.get(uri)
+        if exact is not None:
+            matches.extend(exact.get(event_type, ()))
+
+        node = self._prefix_index
+        segments = uri[1:].split('/')
+        # a prefix matches while the uri still has at least one segment after it
+        for depth in range(len(segments)):
+            if node.handlers:
+                matches.extend(node.handlers.get(event_type, ()))
+            node = node.children.get(segments[depth])
+            if node is None:
+                break
+
+        if len(matches) > 1:
+            matches.sort(key=itemgetter('sequence'))
+        return matches
+
+    def coalescing_stats(self, coro_func) -> Dict[str, int]:
+        """Return how many events were coalesced and dropped for a handler registered with **coalesce**.
+
+        :rtype: dict
+        """
+        stats = {'coalesced': 0, 'dropped': 0}
+        for event in self._registered_uris:
+            coalescer = event['coalescer']
+            if event['coroutine_or_callable'] is coro_func and coalescer is not None:
+                stats['coalesced'] += coalescer.coalesced
+                stats['dropped'] += coalescer.dropped
+        return stats
+
+    def _invoke(self, event: dict, connection, response: WebsocketEventResponse,
+                on_done: Optional[Callable[[], None]] = None) -> Awaitable:
+        return self.dispatcher.submit(event['handler'], connection, response, on_done=on_done)
+
+    async def dispatch(self, connection, response: WebsocketEventResponse) -> None:
+        """Submit each handler matching the event to the dispatcher. The response is shared by all handlers."""
+        handlers = self.matching_handlers(response.uri, response.type)
+        diff_response = None
+        for event in handlers:
+            if event['diff']:
+                if diff_response is None:
+                    diff_response = self._diff_response(connection, response)
+                if (response.type.upper() not in event['event_types'] or not diff_response.patch
+                        or (event['paths'] is not None and not diff_response.changed(*event['paths']))):
+                    continue
+                await self._invoke(event, connection, diff_response)
+            elif event['coalescer'] is not None:
+                await event['coalescer'].offer(event, connection, response)
+            else:
+                await self._invoke(event, connection, response)
+
+    def _diff_response(self, connection, response: WebsocketEventResponse) -> DiffEventResponse:
+        data = response.data
+        previous, patch = self.diffs.update(connection, response.uri, response.type, data)
+        if response.type.upper() == 'DELETE':
+            data = None
+        return DiffEventResponse(event_type=response.type, uri=response.uri, data=data, previous=previous, patch=patch)
+
+    def forget(self, connection) -> None:
+        """Drop the values kept to diff the events of a connection."""
+        self.diffs.forget(connection)
+
     @staticmethod
     def match_event(connector, connection, data):
         """Match registered websocket events and create a task with each handler"""
-        for event in connector.ws.registered_uris:
-            if event['uri'] == data['uri'] or (
-                    event['uri'].endswith('/') and data['uri'].startswith(event['uri'])
-            ):
-                if data['eventType'].upper() in event['event_types']:
-                    ws_dto = WebsocketEventResponse(
-                        event_type=data['eventType'],
-                        uri=data['uri'],
-                        data=data['data'],
-                    )
-                    asyncio.create_task(event['coroutine_or_callable'](connection, ws_dto))
+        task = asyncio.ensure_future(connector.ws.dispatch(connection, WebsocketEventResponse(
+            event_type=data['eventType'],
+            uri=data['uri'],
+            data=data['data'],
+        )))
+        connector.ws._tasks.add(task)
+        task.add_done_callback(connector.ws._tasks.discard)
@@ -0,0 +1,66 @@
+import asyncio
+from collections import namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional, Union
+
+EXECUTOR_KINDS = ('thread', 'process',)
+
+_executors = {}
+
+
+class ConnectionInfo(namedtuple('ConnectionInfo', ('lcu_pid', 'pid', 'port', 'auth_key', 'installation_path'))):
+    """Picklable details of a connection, given to the handlers running in an executor instead of the connection"""
+    __slots__ = ()
+
+    @classmethod
+    def from_connection(cls, connection) -> 'ConnectionInfo':
+        return cls(connection.lcu_pid, connection.pid, connection.port, connection.auth_key,
+                   connection.installation_path)
+
+
+def get_executor(executor: Union[str, Executor]) -> Executor:
+    """Return the shared executor of a kind, creating it on first use, or the given executor."""
+    if isinstance(executor, Executor):
+        return executor
+
+    if executor not in EXECUTOR_KINDS:
+        raise RuntimeError(f'Executor {executor} not recognized.')
+    if executor not in _executors:
+        _executors[executor] = ThreadPoolExecutor() if executor == 'thread' else ProcessPoolExecutor()
+    return _executors[executor]
+
+
+def shutdown_executors() -> None:
+    """Shut down the shared executors, waiting for the running handlers."""
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(wait=True)
+
+
+def offload(func: Callable, executor: Union[str, Executor],
+            on_result: Optional[Callable[..., Awaitable]] = None) -> Callable[..., Awaitable]:
+    """Wrap a regular function into a coroutine function running it in an executor.
+
+    The first argument, the connection, is replaced by its :py:obj:`ConnectionInfo`. Exceptions are raised back in
+    the event loop and the result is passed to **on_result** along with the connection.
+
+    :param func: Function to run, it must be picklable (defined at module level) for process executors
+    :param executor: thread, process or an executor instance
+    :param on_result: Coroutine function called with the connection and the result
+    """
+    if asyncio.iscoroutinefunction(func):
+        raise TypeError('Functions run in an executor should be regular functions. Use \'def\'.')
+    if on_result is not None and not asyncio.iscoroutinefunction(on_result):
+        raise TypeError('Result handlers should be coroutines. Use \'async def\'.')
+    if not isinstance(executor, Executor) and executor not in EXECUTOR_KINDS:
+        raise RuntimeError(f'Executor {executor} not recognized.')
+
+    async def handler(connection, *args):
+        result = await asyncio.get_event_loop().run_in_executor(
+            get_executor(executor), func, ConnectionInfo.from_connection(connection), *args
+        )
+        if on_result is not None:
+            await on_result(connection, result)
+
+    handler.__qualname__ = getattr(func, '__qualname__', handler.__qualname__)
+    return handler
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from .dispatcher import OVERFLOW_POLICIES
+from ..metrics import NULL_METRICS, Metrics
+
+logger = logging.getLogger('lcu-driver')
+
+
+class FramePipeline:
+    """Bounded buffer between the websocket reader and the frame handling
+
+    The reader only appends the received frames to the buffer so the socket keeps being read while frames are parsed
+    and dispatched. The handling stage takes every pending frame, or up to **batch_size** of them, in one pass. When the
+    buffer is full **overflow** decides what happens: **block** stops reading the socket, **drop_oldest** discards the
+    oldest buffered frame and **drop_newest** the received one.
+
+    :param handle: Coroutine function called with each frame and the time it was received
+    :param size: Maximum number of buffered frames
+    :param overflow: block, drop_oldest or drop_newest
+    :param batch_size: Maximum number of frames handled per pass, all the pending ones by default
+    :param metrics: Registry recording the time frames spend in the buffer and the dropped frames
+
+    .. py:attribute:: received
+    .. py:attribute:: processed
+    .. py:attribute:: dropped
+    .. py:attribute:: max_depth
+
+        Maximum number of frames buffered at once
+    .. py:attribute:: lag
+
+        Total seconds frames waited in the buffer
+    .. py:attribute:: max_lag
+    """
+    def __init__(self, handle: Callable[[str, float], Awaitable[None]], *, size: int = 1000,
+                 overflow: str = 'block', batch_size: Optional[int] = None, metrics: Metrics = NULL_METRICS):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Overflow policy {overflow} not recognized.')
+        if size < 1:
+            raise ValueError('The frame buffer must hold at least one frame')
+        if batch_size is not None and batch_size < 1:
+            raise ValueError('Batches must hold at least one frame')
+
+        self.handle = handle
+        self.size = size
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+        self._buffer = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """Number of buffered frames"""
+        return len(self._buffer)
+
+    @property
+    def mean_lag(self) -> float:
+        return self.lag / self.processed if self.processed else 0.0
+
+    async def put(self, frame: str) -> None:
+        """Buffer a received frame."""
+        self.received += 1
+        buffer = self._buffer
+        while len(buffer) >= self.size:
+            if self.overflow == 'drop_newest':
+                self._drop()
+                return
+            if self.overflow == 'drop_oldest':
+                buffer.popleft()
+                self._drop()
+                break
+            self._not_full.clear()
+            await self._not_full.wait()
+
+        buffer.append((time.time(), frame))
+        if len(buffer) > self.max_depth:
+            self.max_depth = len(buffer)
+        self._not_empty.set()
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        if self.metrics.enabled:
+            self.metrics.inc('lcu_ws_frames_dropped_total')
+
+    def close(self) -> None:
+        """Stop :meth:`run` once the buffered frames are handled."""
+        self._closed = True
+        self._not_empty.set()
+
+    async def run(self) -> None:
+        """Handle the buffered frames until the pipeline is closed."""
+        buffer = self._buffer
+        while True:
+            while not buffer:
+                if self._closed:
+                    return
+                self._not_empty.clear()
+                await self._not_empty.wait()
+
+            count = len(buffer) if self.batch_size is None else min(self.batch_size, len(buffer))
+            batch = [buffer.popleft() for _ in range(count)]
+            self._not_full.set()
+
+            for received, frame in batch:
+                lag = time.time() - received
+                self.lag += lag
+                if lag > self.max_lag:
+                    self.max_lag = lag
+                if self.metrics.enabled:
+                    self.metrics.observe('lcu_ws_pipeline_lag_seconds', lag)
+
+                try:
+                    await self.handle(frame, received)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception('Unable to handle a websocket frame')
+                self.processed += 1
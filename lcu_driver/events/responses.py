@@ -1,11 +1,124 @@
+from typing import Any, Dict, List, Optional, Type
+
+from .diffing import paths_changed
+from .views import VIEWS, View
+
+_UNDECODED = object()
+
+
+def _restore_response(event_type, uri, data, raw_data, codec):
+    if raw_data is not None:
+        return WebsocketEventResponse(event_type=event_type, uri=uri, raw_data=raw_data, codec=codec)
+    return WebsocketEventResponse(event_type=event_type, uri=uri, data=data)
+
+
 class WebsocketEventResponse:
-    def __init__(self, **kwargs):
-        """Websocket handler response
+    """Websocket handler response
+
+    A single immutable response is created per frame and shared by every handler it matches. The payload can be given
+    already decoded as **data** or as the raw JSON text **raw_data** together with the **codec** used to decode it the
+    first time it's accessed.
+
+    .. py:attribute:: type
+    .. py:attribute:: uri
+    .. py:attribute:: data
+    .. py:attribute:: view
 
-        .. py:attribute:: type
-        .. py:attribute:: url
-        .. py:attribute:: data
+        Typed view of the payload for the resources listed in :py:obj:`lcu_driver.events.views.VIEWS`, e.g.
+        ``event.view.phase`` for the gameflow session. None for other resources and for events without payload.
+    """
+    __slots__ = ('_type', '_uri', '_raw_data', '_codec', '_data', '_view',)
+
+    def __init__(self, *, event_type: Optional[str] = None, uri: Optional[str] = None, data: Any = None,
+                 raw_data: Optional[str] = None, codec=None):
+        self._type = event_type
+        self._uri = uri
+        self._raw_data = raw_data
+        self._codec = codec
+        self._data = _UNDECODED if raw_data is not None else data
+        self._view = _UNDECODED
+
+    @property
+    def type(self) -> Optional[str]:
+        return self._type
+
+    @property
+    def uri(self) -> Optional[str]:
+        return self._uri
+
+    @property
+    def data(self) -> Any:
+        if self._data is _UNDECODED:
+            self._data = self._codec.loads(self._raw_data)
+            self._raw_data = None
+        return self._data
+
+    @property
+    def view(self) -> Optional[View]:
+        if self._view is _UNDECODED:
+            view_class = VIEWS.get(self._uri)
+            self._view = self.as_view(view_class) if view_class is not None else None
+        return self._view
+
+    def as_view(self, view_class: Type[View]) -> Optional[View]:
+        """Wrap the payload in a view, None when the event has no payload.
+
+        :param view_class: Subclass of :py:obj:`lcu_driver.events.views.View`
         """
-        self.type = kwargs.get('event_type')
-        self.uri = kwargs.get('uri')
-        self.data = kwargs.get('data')
+        data = self.data
+        return view_class(data) if isinstance(data, dict) else None
+
+    def __reduce__(self):
+        # an undecoded payload crosses process boundaries as the raw JSON text, which is cheaper to pickle
+        if self._data is _UNDECODED:
+            return _restore_response, (self._type, self._uri, None, self._raw_data, self._codec)
+        return _restore_response, (self._type, self._uri, self._data, None, None)
+
+    def __repr__(self):
+        return f'<WebsocketEventResponse {self._type} {self._uri}>'
+
+
+def _restore_diff_response(event_type, uri, data, previous, patch):
+    return DiffEventResponse(event_type=event_type, uri=uri, data=data, previous=previous, patch=patch)
+
+
+class DiffEventResponse(WebsocketEventResponse):
+    """Websocket handler response of the handlers registered with **diff**
+
+    .. py:attribute:: data
+
+        Value of the resource after the event, None once deleted
+    .. py:attribute:: previous
+
+        Value of the resource before the event, None when the connection didn't know it
+    .. py:attribute:: patch
+
+        JSON Patch operations turning the previous value into the new one, e.g.
+        ``[{'op': 'replace', 'path': '/timer/phase', 'value': 'FINALIZATION'}]``. The whole value is added when the
+        previous one isn't known and removed when the resource is deleted.
+    """
+    __slots__ = ('_previous', '_patch',)
+
+    def __init__(self, *, event_type: Optional[str] = None, uri: Optional[str] = None, data: Any = None,
+                 previous: Any = None, patch: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(event_type=event_type, uri=uri, data=data)
+        self._previous = previous
+        self._patch = patch or []
+
+    @property
+    def previous(self) -> Any:
+        return self._previous
+
+    @property
+    def patch(self) -> List[Dict[str, Any]]:
+        return self._patch
+
+    def changed(self, *paths: str) -> bool:
+        """Return whether the event changed any of the JSON pointers, e.g. ``event.changed('/timer/phase')``."""
+        return paths_changed(self._patch, paths)
+
+    def __reduce__(self):
+        return _restore_diff_response, (self._type, self._uri, self.data, self._previous, self._patch)
+
+    def __repr__(self):
+        return f'<DiffEventResponse {self._type} {self._uri} {len(self._patch)} changes>'
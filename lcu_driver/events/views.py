@@ -0,0 +1,180 @@
+from typing import Any, Dict, Optional, Type
+
+
+class Field:
+    """Attribute of a view reading a key of the payload when accessed
+
+    :param key: Payload key
+    :param view: View wrapping the value, or each element when the value is a list
+    :param default: Value returned when the key is missing
+    """
+    __slots__ = ('key', 'view', 'default',)
+
+    def __init__(self, key: str, view: Optional[Type['View']] = None, default: Any = None):
+        self.key = key
+        self.view = view
+        self.default = default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = instance._data.get(self.key, self.default)
+        if self.view is None or value is None:
+            return value
+        if isinstance(value, list):
+            return [self.view(item) if isinstance(item, dict) else item for item in value]
+        return self.view(value)
+
+
+class View:
+    """Typed read-only access to a payload, nested values are wrapped on access instead of upfront
+
+    Keys without a field are still available through indexing, e.g. ``view['gameData']``.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """Payload the view reads from"""
+        return self._data
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other._data == self._data
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._data!r})'
+
+
+class Queue(View):
+    __slots__ = ()
+    id = Field('id')
+    type = Field('type')
+    game_mode = Field('gameMode')
+    is_ranked = Field('isRanked', default=False)
+
+
+class GameflowGameData(View):
+    __slots__ = ()
+    game_id = Field('gameId')
+    queue = Field('queue', Queue)
+    is_custom_game = Field('isCustomGame', default=False)
+    team_one = Field('teamOne', default=())
+    team_two = Field('teamTwo', default=())
+
+
+class GameflowMap(View):
+    __slots__ = ()
+    id = Field('id')
+    name = Field('name')
+    game_mode = Field('gameMode')
+
+
+class GameflowSession(View):
+    """``/lol-gameflow/v1/session``"""
+    __slots__ = ()
+    phase = Field('phase')
+    game_data = Field('gameData', GameflowGameData)
+    map = Field('map', GameflowMap)
+
+
+class LobbyMember(View):
+    __slots__ = ()
+    summoner_id = Field('summonerId')
+    puuid = Field('puuid')
+    is_leader = Field('isLeader', default=False)
+    ready = Field('ready', default=False)
+    first_position_preference = Field('firstPositionPreference')
+    second_position_preference = Field('secondPositionPreference')
+
+
+class LobbyGameConfig(View):
+    __slots__ = ()
+    queue_id = Field('queueId')
+    game_mode = Field('gameMode')
+    max_lobby_size = Field('maxLobbySize')
+    is_custom = Field('isCustom', default=False)
+
+
+class Lobby(View):
+    """``/lol-lobby/v2/lobby``"""
+    __slots__ = ()
+    party_id = Field('partyId')
+    can_start_activity = Field('canStartActivity', default=False)
+    members = Field('members', LobbyMember, default=())
+    local_member = Field('localMember', LobbyMember)
+    game_config = Field('gameConfig', LobbyGameConfig)
+
+
+class ChampSelectPlayer(View):
+    __slots__ = ()
+    cell_id = Field('cellId')
+    champion_id = Field('championId', default=0)
+    champion_pick_intent = Field('championPickIntent', default=0)
+    summoner_id = Field('summonerId')
+    puuid = Field('puuid')
+    assigned_position = Field('assignedPosition')
+    selected_skin_id = Field('selectedSkinId')
+    spell1_id = Field('spell1Id')
+    spell2_id = Field('spell2Id')
+    team = Field('team')
+
+
+class ChampSelectAction(View):
+    __slots__ = ()
+    id = Field('id')
+    actor_cell_id = Field('actorCellId')
+    champion_id = Field('championId', default=0)
+    completed = Field('completed', default=False)
+    is_in_progress = Field('isInProgress', default=False)
+    is_ally_action = Field('isAllyAction', default=False)
+    type = Field('type')
+
+
+class ChampSelectTimer(View):
+    __slots__ = ()
+    phase = Field('phase')
+    adjusted_time_left_in_phase = Field('adjustedTimeLeftInPhase')
+
+
+class ChampSelectSession(View):
+    """``/lol-champ-select/v1/session``"""
+    __slots__ = ()
+    game_id = Field('gameId')
+    local_player_cell_id = Field('localPlayerCellId')
+    my_team = Field('myTeam', ChampSelectPlayer, default=())
+    their_team = Field('theirTeam', ChampSelectPlayer, default=())
+    timer = Field('timer', ChampSelectTimer)
+    bench_enabled = Field('benchEnabled', default=False)
+
+    @property
+    def actions(self):
+        """Actions grouped by turn"""
+        return [[ChampSelectAction(action) for action in turn] for turn in self._data.get('actions', ())]
+
+    @property
+    def local_player(self) -> Optional[ChampSelectPlayer]:
+        cell_id = self.local_player_cell_id
+        for player in self._data.get('myTeam', ()):
+            if player.get('cellId') == cell_id:
+                return ChampSelectPlayer(player)
+        return None
+
+
+VIEWS: Dict[str, Type[View]] = {
+    '/lol-gameflow/v1/session': GameflowSession,
+    '/lol-lobby/v2/lobby': Lobby,
+    '/lol-champ-select/v1/session': ChampSelectSession,
+}
@@ -0,0 +1,165 @@
+import re
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r'/(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})(?=/|$)')
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Replace the numeric and UUID path segments by ``{id}`` so every resource of a kind shares its metrics."""
+    return _ID_SEGMENT.sub('/{id}', endpoint.split('?', 1)[0])
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        cumulative = []
+        total = 0
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {'count': self.count, 'sum': self.sum, 'buckets': cumulative}
+
+
+class Metrics:
+    """In-memory metrics registry
+
+    Counters and histograms are identified by their name and labels. Pass an instance to the connector to enable the
+    instrumentation of requests, websocket frames and handlers.
+
+    .. code-block:: python
+
+        metrics = Metrics()
+        connector = Connector(metrics=metrics)
+        ...
+        print(metrics.prometheus())
+
+    :param buckets: Histogram bucket upper bounds, in seconds for the latency metrics
+
+    .. py:attribute:: enabled
+
+        False for the registry used when metrics are disabled, instrumented code checks it before measuring
+    """
+    enabled = True
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._hooks: List[Callable[[str, str, float, Dict[str, str]], None]] = []
+        # connections running in shard threads record into the same registry
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[str, str, float, Dict[str, str]], None]) -> None:
+        """Call **hook** with the kind (counter or histogram), the name, the value and the labels of every record.
+
+        Hooks allow forwarding the measurements to another system, e.g. OpenTelemetry instruments.
+        """
+        self._hooks.append(hook)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+        for hook in self._hooks:
+            hook('counter', name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value in a histogram."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+        for hook in self._hooks:
+            hook('histogram', name, value, labels)
+
+    def snapshot(self) -> dict:
+        """Return the current values as ``{'counters': {name: [(labels, value)]}, 'histograms': {...}}``."""
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        return {
+            'counters': {
+                name: [(dict(labels), value) for labels, value in series.items()]
+                for name, series in self._counters.items()
+            },
+            'histograms': {
+                name: [(dict(labels), histogram.snapshot()) for labels, histogram in series.items()]
+                for name, series in self._histograms.items()
+            },
+        }
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ''
+        escaped = (
+            (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in pairs
+        )
+        return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+    def prometheus(self) -> str:
+        """Return the current values in the Prometheus text exposition format."""
+        with self._lock:
+            return self._prometheus()
+
+    def _prometheus(self) -> str:
+        lines = []
+        for name, series in self._counters.items():
+            lines.append(f'# TYPE {name} counter')
+            for labels, value in series.items():
+                lines.append(f'{name}{self._format_labels(labels)} {value}')
+
+        for name, series in self._histograms.items():
+            lines.append(f'# TYPE {name} histogram')
+            for labels, histogram in series.items():
+                for bound, count in histogram.snapshot()['buckets']:
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{self._format_labels(labels, (("le", le),))} {count}')
+                lines.append(f'{name}_sum{self._format_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{self._format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class NullMetrics(Metrics):
+    """Registry discarding every record, used when metrics are disabled"""
+    enabled = False
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
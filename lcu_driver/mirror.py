@@ -0,0 +1,145 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .events.responses import WebsocketEventResponse
+
+
+class StateMirror:
+    """In-memory copy of LCU resources kept current by the websocket events
+
+    Every connection has one available as :py:attr:`lcu_driver.connection.Connection.state`. Watching a resource
+    fetches it once and then applies its CREATE, UPDATE and DELETE events, so reading it doesn't need a request.
+
+    .. code-block:: python
+
+        connector.watch('/lol-gameflow/v1/gameflow-phase')
+
+        @connector.ready
+        async def connect(connection):
+            print(connection.state.get('/lol-gameflow/v1/gameflow-phase'))
+            await connection.state.wait_for('/lol-gameflow/v1/gameflow-phase', lambda phase: phase == 'ChampSelect')
+
+    Updates require the websocket, resources watched after the connection is ready with a :py:obj:`Connector`
+    without websocket handlers or watched resources only hold their initial value.
+    """
+    def __init__(self, connection):
+        self._connection = connection
+        self._values: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._waiters: Dict[str, List[Tuple[Callable[[Any], bool], asyncio.Future]]] = {}
+
+    @property
+    def watched_uris(self) -> Set[str]:
+        """Watched resources
+
+        :rtype: set
+        """
+        return set(self._versions)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._values
+
+    def get(self, uri: str, default: Any = None) -> Any:
+        """Return the current value of a watched resource or **default** when it doesn't exist."""
+        return self._values.get(uri, default)
+
+    async def watch(self, uri: str) -> Any:
+        """Start mirroring a resource and return its current value.
+
+        :param uri: Resource endpoint, it must match the event URIs exactly
+        """
+        if uri not in self._versions:
+            self._versions[uri] = 0
+            # subscribed before fetching so an update can't fall between the response and the subscription
+            await self._connection._sync_subscriptions()
+        await self._fetch(uri)
+        return self.get(uri)
+
+    def unwatch(self, uri: str) -> None:
+        """Stop mirroring a resource and forget its value."""
+        if self._versions.pop(uri, None) is None:
+            return
+        self._values.pop(uri, None)
+        self._connection._subscriptions_changed()
+
+    async def resync(self) -> None:
+        """Fetch every watched resource again, e.g. after events may have been missed."""
+        await asyncio.gather(*(self._fetch(uri) for uri in self.watched_uris))
+
+    async def _fetch(self, uri: str) -> None:
+        version = self._versions[uri]
+        response = await self._connection.request('get', uri, cache=False)
+        body = await response.read()
+
+        # an event received while the request was running is at least as recent as the response
+        if self._versions.get(uri) != version:
+            return
+
+        if response.status == 200 and body:
+            self._set(uri, self._connection._connector.codec.loads(body))
+        elif response.status == 404:
+            self._delete(uri)
+
+    def apply(self, event: WebsocketEventResponse) -> None:
+        """Apply a websocket event to the mirrored resource it refers to."""
+        if event.uri not in self._versions:
+            return
+
+        self._versions[event.uri] += 1
+        if event.type.upper() == 'DELETE':
+            self._delete(event.uri)
+        else:
+            self._set(event.uri, event.data)
+
+    def _set(self, uri: str, value: Any) -> None:
+        self._values[uri] = value
+        self._notify(uri, value)
+
+    def _delete(self, uri: str) -> None:
+        self._values.pop(uri, None)
+        self._notify(uri, None)
+
+    def _notify(self, uri: str, value: Any) -> None:
+        waiters = self._waiters.get(uri)
+        if not waiters:
+            return
+
+        for waiter in list(waiters):
+            predicate, future = waiter
+            if future.done():
+                waiters.remove(waiter)
+                continue
+            try:
+                matched = predicate(value)
+            except Exception as e:
+                future.set_exception(e)
+                matched = True
+            if matched:
+                waiters.remove(waiter)
+                if not future.done():
+                    future.set_result(value)
+
+    async def wait_for(self, uri: str, predicate: Callable[[Any], bool] = lambda value: value is not None,
+                       timeout: Optional[float] = None) -> Any:
+        """Wait until the value of a watched resource satisfies **predicate** and return it.
+
+        :param uri: Watched resource
+        :param predicate: Called with the current value, None when the resource doesn't exist. Defaults to waiting
+            for the resource to exist.
+        :param timeout: Seconds to wait before raising :py:obj:`asyncio.TimeoutError`
+        """
+        if uri not in self._versions:
+            raise KeyError(f'{uri} is not watched')
+
+        value = self.get(uri)
+        if predicate(value):
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (predicate, future)
+        self._waiters.setdefault(uri, []).append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if waiter in self._waiters.get(uri, ()):
+                self._waiters[uri].remove(waiter)
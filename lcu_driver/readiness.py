@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Iterable, Iterator, Optional
+
+import aiohttp
+
+logger = logging.getLogger('lcu-driver')
+
+
+def backoff_delays(initial_delay: float, max_delay: float, multiplier: float = 2.0,
+                   jitter: float = 0.2) -> Iterator[float]:
+    """Yield exponentially growing delays, up to **max_delay**, with a random **jitter** fraction added or removed."""
+    delay = initial_delay
+    while True:
+        yield delay * (1 + random.uniform(-jitter, jitter))
+        delay = min(delay * multiplier, max_delay)
+
+
+class ReadinessProbe:
+    """Strategy used to wait for the League Client API to accept requests
+
+    Every endpoint is requested until all of them answer, waiting between attempts with an exponential backoff and
+    random jitter.
+
+    :param endpoints: Endpoints that must answer
+    :param initial_delay: Seconds to wait after the first failed attempt
+    :param max_delay: Maximum seconds between attempts
+    :param multiplier: Factor applied to the delay after each failed attempt
+    :param jitter: Fraction of the delay added or removed at random
+    :param timeout: Seconds after which :py:obj:`asyncio.TimeoutError` is raised, None to wait forever
+    :param require_success: Consider only responses with a status below 400 as ready, by default any response is
+    """
+    def __init__(self, endpoints: Iterable[str] = ('/riotclient/region-locale',), *, initial_delay: float = 0.05,
+                 max_delay: float = 2.0, multiplier: float = 2.0, jitter: float = 0.2,
+                 timeout: Optional[float] = None, require_success: bool = False):
+        self.endpoints = tuple(endpoints)
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.timeout = timeout
+        self.require_success = require_success
+
+    def delays(self) -> Iterator[float]:
+        return backoff_delays(self.initial_delay, self.max_delay, self.multiplier, self.jitter)
+
+    async def _endpoint_ready(self, session: aiohttp.ClientSession, url: str) -> bool:
+        try:
+            async with session.get(url) as response:
+                return not self.require_success or response.status < 400
+        except aiohttp.ClientError:
+            return False
+
+    async def _poll(self, connection) -> int:
+        pending = list(self.endpoints)
+        attempts = 0
+        for delay in self.delays():
+            attempts += 1
+            ready = await asyncio.gather(
+                *(self._endpoint_ready(connection.session, f'{connection.address}{endpoint}') for endpoint in pending)
+            )
+            pending = [endpoint for endpoint, is_ready in zip(pending, ready) if not is_ready]
+            if not pending:
+                return attempts
+            await asyncio.sleep(delay)
+
+    async def wait(self, connection) -> int:
+        """Wait until the connection API is ready.
+
+        :return: Number of attempts made
+        :raises: :py:obj:`asyncio.TimeoutError` when the API isn't ready within **timeout**
+        """
+        start = time.perf_counter()
+        attempts = await asyncio.wait_for(self._poll(connection), self.timeout)
+        logger.debug('API ready after %s attempts in %.3f seconds', attempts, time.perf_counter() - start)
+        return attempts
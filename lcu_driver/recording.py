@@ -0,0 +1,102 @@
+import asyncio
+import gzip
+import time
+import zlib
+from typing import Iterator, Optional, Tuple
+
+
+class FrameRecorder:
+    """Append websocket frames with their timestamp to a gzip compressed file
+
+    Each line holds the time the frame was received and the frame, separated by a tab. Recording again to the same file
+    appends a new gzip member, which readers handle transparently. The compressor is flushed every **flush_interval**
+    seconds so the frames recorded so far can be read even if the process dies.
+
+    :param path: Recording file
+    :param flush_interval: Maximum seconds between flushes
+    :param compresslevel: Gzip compression level, lower is faster
+
+    .. py:attribute:: frames
+
+        Number of frames recorded
+    """
+    def __init__(self, path: str, *, flush_interval: float = 1.0, compresslevel: int = 6):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self._file = gzip.open(path, 'at', compresslevel=compresslevel, encoding='utf-8')
+        self._flushed = time.monotonic()
+
+    def record(self, frame: str, timestamp: Optional[float] = None) -> None:
+        """Append a frame, **timestamp** defaults to now."""
+        if timestamp is None:
+            timestamp = time.time()
+
+        # newlines in a JSON document can only be whitespace, escaped ones are inside strings
+        self._file.write(f'{timestamp:.6f}\t{frame.replace(chr(10), " ")}\n')
+        self.frames += 1
+
+        now = time.monotonic()
+        if now - self._flushed >= self.flush_interval:
+            self._file.flush()
+            self._flushed = now
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, str]]:
+    """Iterate over the ``(timestamp, frame)`` of a recording.
+
+    A recording cut short, e.g. by the process being killed, is read up to its last complete frame.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        try:
+            for line in file:
+                if not line.endswith('\n'):
+                    return
+                timestamp, frame = line.rstrip('\n').split('\t', 1)
+                yield float(timestamp), frame
+        except (EOFError, zlib.error):
+            return
+
+
+async def replay(connection, path: str, *, speed: Optional[float] = None) -> int:
+    """Feed a recording through a connection as if its frames were received from the client.
+
+    The frames go through the same parsing, cache, state mirror and handler dispatch as live ones. A connection doesn't
+    need to be initialized to replay frames, but its handlers can't make requests then.
+
+    .. code-block:: python
+
+        connection = Connection(connector, '0:0:0:replay')
+        await replay(connection, 'session.gz')
+        await connector.dispatcher.close()
+
+    :param connection: Connection the frames are handled by
+    :type connection: :py:obj:`lcu_driver.connection.Connection`
+    :param path: Recording file
+    :param speed: Replay speed relative to the recording, 1 for real time. As fast as possible by default.
+    :return: Number of frames replayed
+    """
+    count = 0
+    first = start = None
+    for timestamp, frame in read_frames(path):
+        if speed is not None:
+            if first is None:
+                first, start = timestamp, time.monotonic()
+            delay = start + (timestamp - first) / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await connection._handle_frame(frame)
+        count += 1
+        if speed is None and count % 100 == 0:
+            # let the handler tasks run, they would pile up otherwise
+            await asyncio.sleep(0)
+    return count
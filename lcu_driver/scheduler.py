@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Union
+
+from .metrics import NULL_METRICS, Metrics
+
+PRIORITIES = ('interactive', 'normal', 'bulk',)
+
+RateLimit = Union[float, Tuple[float, float]]
+
+
+class TokenBucket:
+    """Allow **rate** requests per second on average with bursts of up to **burst** requests"""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated',)
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError('Rate limits must be positive')
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available, 0 when one already is."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class _Waiter:
+    __slots__ = ('future', 'bucket',)
+
+    def __init__(self, future: asyncio.Future, bucket: Optional[TokenBucket]):
+        self.future = future
+        self.bucket = bucket
+
+
+class RequestScheduler:
+    """Decide when the requests of a connection are sent
+
+    Requests wait for a token of the bucket of the longest endpoint prefix in **limits** and for one of the
+    **concurrency** slots. Waiting requests are started by priority, **interactive** before **normal** before
+    **bulk**, a request whose bucket is empty doesn't hold back the requests of other prefixes.
+
+    :param limits: Requests per second, or a tuple with the requests per second and the burst size, per endpoint
+        prefix, e.g. ``{'/lol-game-data/': (20, 5)}``
+    :param concurrency: Maximum number of requests waiting for the client answer, no limit by default
+    :param metrics: Registry recording the time requests wait per priority
+
+    .. py:attribute:: delayed
+
+        Requests that had to wait
+    """
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None, *, concurrency: Optional[int] = None,
+                 metrics: Metrics = NULL_METRICS):
+        self.concurrency = concurrency
+        self.metrics = metrics
+        self.in_flight = 0
+        self.delayed = 0
+
+        buckets = {}
+        for prefix, limit in (limits or {}).items():
+            buckets[prefix] = TokenBucket(*limit) if isinstance(limit, tuple) else TokenBucket(limit)
+        # longest prefix first so the most specific limit applies
+        self._buckets = sorted(buckets.items(), key=lambda item: len(item[0]), reverse=True)
+        self._queues = [deque() for _ in PRIORITIES]
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting to be sent"""
+        return sum(len(queue) for queue in self._queues)
+
+    def _bucket(self, path: str) -> Optional[TokenBucket]:
+        for prefix, bucket in self._buckets:
+            if path.startswith(prefix):
+                return bucket
+        return None
+
+    async def acquire(self, path: str, priority: str = 'normal') -> float:
+        """Wait until a request to **path** can be sent, :meth:`release` must be called once it's answered.
+
+        :return: Seconds waited
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f'Priority {priority} not recognized, expected one of {", ".join(PRIORITIES)}')
+
+        bucket = self._bucket(path)
+        now = time.monotonic()
+        if (not self.waiting and (self.concurrency is None or self.in_flight < self.concurrency)
+                and (bucket is None or bucket.wait_time(now) == 0)):
+            if bucket is not None:
+                bucket.take()
+            self.in_flight += 1
+            return 0.0
+
+        self.delayed += 1
+        waiter = _Waiter(asyncio.get_event_loop().create_future(), bucket)
+        queue = self._queues[PRIORITIES.index(priority)]
+        queue.append(waiter)
+        self._pump()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()
+            elif waiter in queue:
+                queue.remove(waiter)
+            raise
+
+        waited = time.monotonic() - now
+        if self.metrics.enabled:
+            self.metrics.observe('lcu_request_queue_seconds', waited, priority=priority)
+        return waited
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        """Start the waiting requests that can be, by priority."""
+        now = time.monotonic()
+        next_token = None
+        for queue in self._queues:
+            for waiter in list(queue):
+                if self.concurrency is not None and self.in_flight >= self.concurrency:
+                    # a release pumps again
+                    return
+                if waiter.future.done():
+                    queue.remove(waiter)
+                    continue
+
+                if waiter.bucket is not None:
+                    delay = waiter.bucket.wait_time(now)
+                    if delay > 0:
+                        next_token = delay if next_token is None else min(next_token, delay)
+                        continue
+                    waiter.bucket.take()
+
+                queue.remove(waiter)
+                self.in_flight += 1
+                waiter.future.set_result(None)
+
+        if next_token is not None:
+            self._schedule(next_token)
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_event_loop()
+        when = loop.time() + delay
+        if self._timer is not None:
+            if self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._pump()
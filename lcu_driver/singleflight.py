@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one
+
+    The first call for a key runs, the calls made with the same key while it's running wait for it and get its result
+    or its exception. Cancelling a waiting call doesn't cancel the shared one.
+
+    .. py:attribute:: hits
+
+        Calls that joined a running call
+    .. py:attribute:: misses
+
+        Calls that ran
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of running calls"""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run **func**, or wait for the running call with the same **key**."""
+        future = self._calls.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.ensure_future(func())
+        self._calls[key] = future
+        future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future)
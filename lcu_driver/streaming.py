@@ -0,0 +1,121 @@
+import codecs
+import json
+import os
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER = '0123456789+-.eE'
+
+
+async def iter_json_array(response: aiohttp.ClientResponse, *, chunk_size: int = 65536) -> AsyncIterator[Any]:
+    """Decode the elements of a JSON array body one at a time while it's downloaded.
+
+    Only the element being decoded and one chunk are held in memory, whatever the size of the body. Elements are
+    decoded with the standard library since the other codecs can't decode a document prefix.
+
+    :param response: Response whose body is a JSON array
+    :param chunk_size: Bytes read at once
+    :raises: :py:obj:`aiohttp.ClientResponseError` when the response status is 400 or above, :py:obj:`ValueError` when
+        the body isn't a JSON array
+    """
+    response.raise_for_status()
+
+    # JSON is UTF-8 unless the response says otherwise
+    text = codecs.getincrementaldecoder(response.charset or 'utf-8')()
+    chunks = response.content.iter_chunked(chunk_size)
+    buffer = ''
+    position = 0
+    eof = False
+    # what the next non whitespace character must be: the opening bracket, a value or the closing bracket of an empty
+    # array, a value, or the separator after a value
+    expected = '['
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+
+        if position < len(buffer):
+            char = buffer[position]
+            if expected == '[':
+                if char != '[':
+                    raise ValueError('The response body is not a JSON array')
+                expected = 'first'
+                position += 1
+                continue
+            if expected == ',':
+                if char == ']':
+                    return
+                if char != ',':
+                    raise ValueError(f'Expected , or ] in the JSON array, got {char!r}')
+                expected = 'value'
+                position += 1
+                continue
+            if char == ']' and expected == 'first':
+                return
+            if char in ',]':
+                raise ValueError(f'Expected a value in the JSON array, got {char!r}')
+
+            try:
+                element, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+
+            if end is not None:
+                follow = end
+                while follow < len(buffer) and buffer[follow] in _WHITESPACE:
+                    follow += 1
+
+                # an element is only complete once what follows it is known, a number at the end of the buffer may
+                # continue in the next chunk
+                if follow < len(buffer) and buffer[follow] in ',]' or follow == len(buffer) and eof:
+                    position = end
+                    expected = ','
+                    yield element
+                    continue
+                if follow < len(buffer) and (follow > end or buffer[end:].strip(_NUMBER) or eof):
+                    raise ValueError(f'Expected , or ] in the JSON array, got {buffer[follow]!r}')
+        elif eof:
+            raise ValueError('The JSON array in the response body is incomplete')
+
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            eof = True
+            buffer = buffer[position:] + text.decode(b'', final=True)
+        else:
+            buffer = buffer[position:] + text.decode(chunk)
+        position = 0
+
+
+async def download(response: aiohttp.ClientResponse, path: str, *, chunk_size: int = 65536) -> int:
+    """Write a response body to a file as it's received.
+
+    The body is written next to **path** and moved there once complete, so an interrupted download never leaves a
+    truncated file behind.
+
+    :param response: Response to save
+    :param path: Destination file
+    :param chunk_size: Bytes read at once
+    :return: Number of bytes written
+    :raises: :py:obj:`aiohttp.ClientResponseError` when the response status is 400 or above
+    """
+    response.raise_for_status()
+
+    partial = f'{path}.part'
+    written = 0
+    try:
+        with open(partial, 'wb') as file:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                file.write(chunk)
+                written += len(chunk)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return written
@@ -1,4 +1,4 @@
-from typing import Dict, Generator, List
+from typing import Dict, Generator, List, Optional
 
 from psutil import STATUS_ZOMBIE, Process, process_iter
 
@@ -12,6 +12,20 @@ def parse_cmdline_args(cmdline_args) -> Dict[str, str]:
     return cmdline_args_parsed
 
 
+UX_PROCESS_NAMES = ('LeagueClientUx.exe', 'LeagueClientUx',)
+
+
+def _is_ux_process(process: Process, cmdline: Optional[List[str]] = None) -> bool:
+    if process.name() in UX_PROCESS_NAMES:
+        return True
+
+    # Check cmdline for the executable, especially useful in Linux environments
+    # where process names might differ due to compatibility layers like wine.
+    if cmdline is None:
+        cmdline = process.cmdline()
+    return bool(cmdline) and cmdline[0].endswith("LeagueClientUx.exe")
+
+
 def _return_ux_process() -> Generator[Process, None, None]:
     for process in process_iter(attrs=["cmdline"]):
         if process.status() == STATUS_ZOMBIE:
@@ -19,10 +33,5 @@ def _return_ux_process() -> Generator[Process, None, None]:
 
         cmdline: List[str] = process.info.get("cmdline", [])
 
-        if process.name() in ["LeagueClientUx.exe", "LeagueClientUx"]:
-            yield process
-
-        # Check cmdline for the executable, especially useful in Linux environments
-        # where process names might differ due to compatibility layers like wine.
-        if cmdline and cmdline[0].endswith("LeagueClientUx.exe"):
+        if _is_ux_process(process, cmdline):
             yield process